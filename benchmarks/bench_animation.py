@@ -0,0 +1,57 @@
+import argparse
+import random
+import time
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+import matplotlib.pyplot as plt
+
+from network.draw import GraphDrawer
+from network.graph import Graph
+from network.simulation import Simulation
+from network.transmission import GraphTransmission, FIFOSelector
+
+
+def random_tree(n_nodes, seed):
+    rand = random.Random(seed)
+    graph = Graph(directed=False)
+    for node in range(1, n_nodes):
+        graph.add_edge((rand.randrange(node), node), strength=rand.random())
+    return graph
+
+
+def render(graph, frames, blit, backend):
+    sim = Simulation(GraphTransmission(graph, 0, FIFOSelector()))
+    fig = plt.figure()
+    anim = GraphDrawer(graph, edge_backend=backend).animate(sim, fig=fig, every=1, max_frames=frames,
+                                      linewidth=(0.5, 2), blit=blit)
+    start = time.perf_counter()
+    anim._init_draw()
+    rendered = 0
+    for frame in anim.new_frame_seq():
+        anim._draw_next_frame(frame, blit=blit)
+        rendered += 1
+    plt.close(fig)
+    return rendered, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time GraphAnimator frame rendering on the Agg backend')
+    parser.add_argument('--nodes', type=int, default=5000)
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--backends', nargs='+', default=['quiver', 'lines'])
+    args = parser.parse_args()
+
+    graph = random_tree(args.nodes, args.seed)
+    for backend in args.backends:
+        for blit in (False, True):
+            rendered, elapsed = render(graph, args.frames, blit, backend)
+            print(f'{backend:6}  blit={blit!s:5}  {rendered} frames in {elapsed:6.1f} s  '
+                  f'({elapsed / rendered * 1000:6.1f} ms/frame)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+import argparse
+import random
+import time
+
+from network.examples.community import community_graph, compact_community_graph
+
+
+def town_args(n_nodes, community_size=3):
+    n_communities = n_nodes // (community_size + 1)
+    orphans = n_nodes - n_communities * community_size
+    return n_communities, community_size, orphans, int(n_nodes * 1.5), int(n_nodes * 1.5)
+
+
+def time_build(build, n_nodes, seed):
+    start = time.perf_counter()
+    graph, _ = build(*town_args(n_nodes), core_kw={'strength': 0.6}, strong_kw={'strength': 0.4},
+                     weak_kw={'strength': 0.1}, random=random.Random(seed))
+    return graph, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time community town generation')
+    parser.add_argument('--nodes', type=int, nargs='+', default=[2000, 20000, 1000000])
+    parser.add_argument('--graph-max', type=int, default=20000,
+                        help='largest town to also build with the Graph-based generator')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    for n_nodes in args.nodes:
+        builders = [('compact', compact_community_graph)]
+        if n_nodes <= args.graph_max:
+            builders.append(('graph', community_graph))
+        for name, build in builders:
+            graph, elapsed = time_build(build, n_nodes, args.seed)
+            print(f'{name:8} {n_nodes:>9} nodes  {graph.num_edges:>9} edges  {elapsed:8.2f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import time
+import tracemalloc
+
+from network.compact import CompactGraph
+from network.examples.community import community_graph
+from network.randoms import fix_random
+
+
+def build_graph(n_communities, community_size=3):
+    total = n_communities * community_size + n_communities
+    with fix_random():
+        graph, _ = community_graph(
+            n_communities, community_size, n_communities,
+            int(total * 1.5), int(total * 1.5),
+            core_kw={'strength': 0.6}, strong_kw={'strength': 0.4}, weak_kw={'strength': 0.1}
+        )
+    return graph
+
+
+def measure_memory(build):
+    tracemalloc.start()
+    built = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return built, size
+
+
+def time_traversal(graph, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for node in graph.nodes:
+            for edge in graph.outbound_edges(node):
+                edge.attr('strength')
+    return (time.perf_counter() - start) / repeat
+
+
+def time_bfs(graph, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for nodes in graph.children(0, deg=None):
+            if not nodes:
+                break
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare Graph and CompactGraph memory and throughput')
+    parser.add_argument('--communities', type=int, default=400)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    graph, graph_bytes = measure_memory(lambda: build_graph(args.communities))
+    compact, compact_bytes = measure_memory(lambda: CompactGraph.from_graph(graph))
+
+    print(f'nodes={len(graph.nodes)} edges={int(graph.num_edges)}')
+    print(f'{"":>14} {"memory (KiB)":>14} {"edges/s":>12} {"bfs (ms)":>10}')
+    for name, g, nbytes in (('Graph', graph, graph_bytes), ('CompactGraph', compact, compact_bytes)):
+        per_pass = time_traversal(g, args.repeat)
+        edges_per_s = 2 * graph.num_edges / per_pass
+        bfs_ms = time_bfs(g, args.repeat) * 1000
+        print(f'{name:>14} {nbytes / 1024:>14.1f} {edges_per_s:>12.0f} {bfs_ms:>10.2f}')
+    print(f'CompactGraph array storage: {compact.nbytes / 1024:.1f} KiB')
+
+
+if __name__ == '__main__':
+    main()
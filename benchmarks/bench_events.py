@@ -0,0 +1,42 @@
+import argparse
+import random
+import time
+
+from benchmarks.bench_transmission import build_graph
+from network.examples import virus
+from network.simulation import rv
+
+
+def time_run(graph, incubation, contagious, event_driven, seed):
+    sim = virus.virus_simulation(graph, 0, incubation_period=incubation, contagious_for=contagious,
+                                 runner=None, random=random.Random(seed), record='history',
+                                 event_driven=event_driven)
+    start = time.perf_counter()
+    sim.run()
+    return time.perf_counter() - start, sim.history[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare step-by-step and event-driven transmission')
+    parser.add_argument('--communities', type=int, default=1000)
+    parser.add_argument('--min-lag', type=int, default=20)
+    parser.add_argument('--max-lag', type=int, default=60)
+    parser.add_argument('--min-contagious', type=int, default=1)
+    parser.add_argument('--max-contagious', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    graph = build_graph(args.communities)
+    incubation = rv.randint(args.min_lag, args.max_lag)
+    contagious = rv.randint(args.min_contagious, args.max_contagious)
+    print(f'nodes={len(graph.nodes)} edges={graph.num_edges}')
+
+    stepped, stepped_state = time_run(graph, incubation, contagious, False, args.seed)
+    events, events_state = time_run(graph, incubation, contagious, True, args.seed)
+    print(f'GraphTransmission: {stepped * 1000:8.1f} ms  {stepped_state}')
+    print(f'EventTransmission: {events * 1000:8.1f} ms  {events_state}')
+    print(f'speedup: {stepped / events:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
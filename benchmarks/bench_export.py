@@ -0,0 +1,38 @@
+import argparse
+import tempfile
+import time
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+from benchmarks.bench_animation import random_tree
+from network.draw import GraphDrawer
+from network.export import export_frames
+from network.simulation import Simulation
+from network.transmission import GraphTransmission, FIFOSelector
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time headless PNG frame export across worker counts')
+    parser.add_argument('--nodes', type=int, default=2000)
+    parser.add_argument('--steps', type=int, default=120)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4])
+    args = parser.parse_args()
+
+    graph = random_tree(args.nodes, args.seed)
+    drawer = GraphDrawer(graph, edge_backend='lines')
+    for workers in args.workers:
+        sim = Simulation(GraphTransmission(graph, 0, FIFOSelector()))
+        with tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            frames = export_frames(sim, drawer, directory, every=1, steps=args.steps, workers=workers,
+                                   linewidth=(0.5, 2))
+            elapsed = time.perf_counter() - start
+        print(f'workers={workers}  {len(frames)} frames in {elapsed:6.1f} s  '
+              f'({elapsed / len(frames) * 1000:6.1f} ms/frame)')
+
+
+if __name__ == '__main__':
+    main()
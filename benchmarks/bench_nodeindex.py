@@ -0,0 +1,97 @@
+import argparse
+import time
+from collections import deque
+
+import numpy as np
+
+from benchmarks.bench_transmission import build_graph
+from network.compact import CompactGraph
+from network.graph import Graph
+
+
+def relabel(graph):
+    labelled = Graph(directed=graph.directed)
+    for edge in graph.iter_edges():
+        labelled.add_edge((('person', edge.from_node), ('person', edge.to_node)), **edge.attrs)
+    return labelled
+
+
+def keyed_bfs(graph, source):
+    seen = {source}
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        for neighbor in graph._A[node]:
+            if neighbor not in seen:
+                seen.add(neighbor)
+                queue.append(neighbor)
+    return len(seen)
+
+
+def indexed_bfs(offsets, targets, source):
+    offsets = offsets.tolist()
+    targets = targets.tolist()
+    seen = bytearray(len(offsets) - 1)
+    seen[source] = 1
+    queue = deque([source])
+    count = 1
+    while queue:
+        node = queue.popleft()
+        for neighbor in targets[offsets[node]:offsets[node + 1]]:
+            if not seen[neighbor]:
+                seen[neighbor] = 1
+                count += 1
+                queue.append(neighbor)
+    return count
+
+
+def keyed_states(nodes, rounds):
+    states = dict.fromkeys(nodes, 0)
+    for step in range(rounds):
+        for node in nodes[step::rounds]:
+            states[node] = 2
+    return sum(1 for state in states.values() if state == 2)
+
+
+def indexed_states(n_nodes, rounds):
+    states = np.zeros(n_nodes, dtype=np.int8)
+    for step in range(rounds):
+        states[step::rounds] = 2
+    return int(np.count_nonzero(states == 2))
+
+
+def best_of(func, *args, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare object-keyed and int-indexed traversal')
+    parser.add_argument('--communities', type=int, default=20000)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    graph = relabel(build_graph(args.communities))
+    compact = CompactGraph.from_graph(graph)
+    source = next(iter(graph.nodes))
+    print(f'nodes={len(graph.nodes)} edges={graph.num_edges}')
+
+    keyed, keyed_count = best_of(keyed_bfs, graph, source)
+    indexed, indexed_count = best_of(indexed_bfs, compact.offsets, compact.targets, compact.node_id(source))
+    assert keyed_count == indexed_count
+    print(f'BFS object-keyed: {keyed * 1000:8.1f} ms')
+    print(f'BFS int-indexed:  {indexed * 1000:8.1f} ms  ({keyed / indexed:.1f}x)')
+
+    nodes = list(graph.nodes)
+    keyed, _ = best_of(keyed_states, nodes, args.rounds)
+    indexed, _ = best_of(indexed_states, len(nodes), args.rounds)
+    print(f'state updates object-keyed: {keyed * 1000:8.1f} ms')
+    print(f'state updates int-indexed:  {indexed * 1000:8.1f} ms  ({keyed / indexed:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+import argparse
+import time
+
+from network import randoms
+
+
+def time_per_call(func, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls
+
+
+def fix_random_once():
+    with randoms.fix_random():
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-call cost of fix_random with and without a cached state')
+    parser.add_argument('--calls', type=int, default=2000)
+    args = parser.parse_args()
+
+    uncached = time_per_call(lambda: (randoms.get_fixed_state.cache_clear(), fix_random_once()), args.calls)
+    cached = time_per_call(fix_random_once, args.calls)
+    print(f'unpickled each call: {uncached * 1e6:8.2f} us/call')
+    print(f'cached state:        {cached * 1e6:8.2f} us/call')
+    print(f'speedup: {uncached / cached:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
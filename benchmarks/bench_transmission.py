@@ -0,0 +1,52 @@
+import argparse
+import time
+
+from network.compact import CompactGraph
+from network.examples import virus
+from network.examples.community import community_graph
+from network.randoms import fix_random
+from network.simulation import rv
+
+
+def build_graph(n_communities, community_size=3):
+    total = n_communities * community_size + n_communities
+    with fix_random():
+        graph, _ = community_graph(
+            n_communities, community_size, n_communities,
+            int(total * 1.5), int(total * 1.5),
+            core_kw={'strength': 0.6}, strong_kw={'strength': 0.4}, weak_kw={'strength': 0.1}
+        )
+    return graph
+
+
+def time_per_step(graph, steps, vectorized):
+    with fix_random():
+        sim = virus.virus_simulation(graph, 0, incubation_period=rv.randint(1, 3),
+                                     contagious_for=rv.choice(2, 3, 4), runner=None,
+                                     vectorized=vectorized, record='history')
+        start = time.perf_counter()
+        sim.run(steps)
+        elapsed = time.perf_counter() - start
+    n_steps = len(sim.history) - 1
+    return elapsed / n_steps, sim.transmission.broadcasts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare per-step cost of scalar and vectorized transmission')
+    parser.add_argument('--communities', type=int, default=5000)
+    parser.add_argument('--steps', type=int, default=100)
+    args = parser.parse_args()
+
+    graph = build_graph(args.communities)
+    compact = CompactGraph.from_graph(graph)
+    print(f'nodes={len(graph.nodes)} edges={graph.num_edges}')
+
+    scalar, scalar_broadcasts = time_per_step(graph, args.steps, vectorized=False)
+    vectorized, vectorized_broadcasts = time_per_step(compact, args.steps, vectorized=True)
+    print(f'GraphTransmission:     {scalar * 1000:8.2f} ms/step  ({scalar_broadcasts} broadcasts)')
+    print(f'BernoulliTransmission: {vectorized * 1000:8.2f} ms/step  ({vectorized_broadcasts} broadcasts)')
+    print(f'speedup: {scalar / vectorized:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,411 @@
+from collections import Counter
+from collections.abc import Mapping
+from numbers import Integral, Real
+
+import numpy as np
+
+from network.graph import Graph, Levels, _Edge, _EdgeCursor
+from network.nodeindex import NodeIndex
+
+_MISSING = object()
+
+
+class _Column:
+    def __init__(self, values, present=None, categories=None):
+        self.values = values
+        self.present = present
+        self.categories = categories
+
+    @classmethod
+    def build(cls, raw_values):
+        present = np.array([v is not _MISSING for v in raw_values], dtype=bool)
+        found = [v for v in raw_values if v is not _MISSING]
+        mask = None if present.all() else present
+
+        if all(isinstance(v, bool) for v in found):
+            dtype = bool
+        elif all(isinstance(v, Integral) and not isinstance(v, bool) for v in found):
+            dtype = np.int64
+        elif all(isinstance(v, Real) and not isinstance(v, bool) for v in found):
+            dtype = np.float64
+        else:
+            dtype = None
+
+        if dtype is not None:
+            fill = dtype(0)
+            values = np.array([fill if v is _MISSING else v for v in raw_values], dtype=dtype)
+            return cls(values, mask)
+
+        try:
+            categories = list(dict.fromkeys(found))
+        except TypeError:
+            values = np.empty(len(raw_values), dtype=object)
+            values[:] = [None if v is _MISSING else v for v in raw_values]
+            return cls(values, mask)
+
+        codes = {category: code for code, category in enumerate(categories)}
+        values = np.array([-1 if v is _MISSING else codes[v] for v in raw_values],
+                          dtype=np.int32)
+        return cls(values, mask, tuple(categories))
+
+    @property
+    def nbytes(self):
+        present_bytes = 0 if self.present is None else self.present.nbytes
+        return self.values.nbytes + present_bytes
+
+    def get(self, edge_id):
+        if self.present is not None and not self.present.item(edge_id):
+            return _MISSING
+        value = self.values.item(edge_id)
+        if self.categories is not None:
+            return self.categories[value]
+        return value
+
+
+class _EdgeAttrs(Mapping):
+    __slots__ = ('_columns', '_edge_id')
+
+    def __init__(self, columns, edge_id):
+        self._columns = columns
+        self._edge_id = edge_id
+
+    def __getitem__(self, name):
+        value = self._columns[name].get(self._edge_id)
+        if value is _MISSING:
+            raise KeyError(name)
+        return value
+
+    def get(self, name, default=None):
+        column = self._columns.get(name)
+        if column is None:
+            return default
+        value = column.get(self._edge_id)
+        return default if value is _MISSING else value
+
+    def __iter__(self):
+        return (name for name, column in self._columns.items()
+                if column.get(self._edge_id) is not _MISSING)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class _CompactEdgeCursor(_EdgeCursor):
+    __slots__ = ('_view',)
+
+    def __init__(self, columns):
+        super().__init__()
+        self._view = _EdgeAttrs(columns, None)
+
+    def _move_to_id(self, from_node, to_node, edge_id):
+        self._view._edge_id = edge_id
+        return self._move_to(from_node, to_node, self._view)
+
+    def detach(self):
+        return _Edge(self.from_node, self.to_node, _EdgeAttrs(self._view._columns, self._view._edge_id))
+
+
+class CompactGraph:
+    @classmethod
+    def from_graph(cls, graph):
+        index = graph.node_index.freeze()
+        nodes = index.nodes
+        offsets = np.zeros(len(nodes) + 1, dtype=np.int64)
+        targets = []
+        edge_ids = []
+        edge_attrs = []
+        seen_edge_ids = {}
+
+        for i, node in enumerate(nodes):
+            for edge in graph.outbound_edges(node):
+                to_index = index[edge.to_node]
+                key = (i, to_index) if graph.directed else (min(i, to_index), max(i, to_index))
+                if key not in seen_edge_ids:
+                    seen_edge_ids[key] = len(edge_attrs)
+                    edge_attrs.append(edge.attrs)
+                targets.append(to_index)
+                edge_ids.append(seen_edge_ids[key])
+            offsets[i + 1] = len(targets)
+
+        return cls(index, offsets, np.array(targets, dtype=np.int64),
+                   np.array(edge_ids, dtype=np.int64), graph.directed,
+                   _build_columns(edge_attrs))
+
+    @classmethod
+    def from_arrays(cls, nodes, sources, targets, directed, **columns):
+        nodes = list(nodes)
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        if sources.shape != targets.shape:
+            raise ValueError('sources and targets must be the same length')
+        n_edges = len(sources)
+        edge_ids = np.arange(n_edges, dtype=np.int64)
+
+        if not directed:
+            keep = np.column_stack([np.ones(n_edges, dtype=bool), sources != targets]).ravel()
+            sources, targets = (np.column_stack([sources, targets]).ravel()[keep],
+                                np.column_stack([targets, sources]).ravel()[keep])
+            edge_ids = np.repeat(edge_ids, 2)[keep]
+
+        order = np.argsort(sources, kind='stable')
+        offsets = np.zeros(len(nodes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=len(nodes)), out=offsets[1:])
+
+        built_columns = {}
+        for name, values in columns.items():
+            if isinstance(values, _Column):
+                built_columns[name] = values
+            else:
+                values = np.asarray(values)
+                if len(values) != n_edges:
+                    raise ValueError(f'Column {name} must have one value per edge')
+                if values.dtype.kind in 'biuf':
+                    built_columns[name] = _Column(values)
+                else:
+                    built_columns[name] = _Column.build(list(values))
+
+        return cls(nodes, offsets, targets[order], edge_ids[order], directed, built_columns)
+
+    def __init__(self, nodes, offsets, targets, edge_ids, directed, columns):
+        self._node_index = nodes.freeze() if isinstance(nodes, NodeIndex) else NodeIndex(nodes, frozen=True)
+        self._nodes = self._node_index._nodes
+        self._index = self._node_index._ids
+        self._offsets = offsets
+        self._targets = targets
+        self._edge_ids = edge_ids
+        self._directed = directed
+        self._columns = columns
+        self._num_edges = int(edge_ids.max()) + 1 if len(edge_ids) else 0
+        self._in_degree_cache = {}
+
+    @property
+    def nodes(self):
+        return self._index.keys()
+
+    @property
+    def num_edges(self):
+        return self._num_edges
+
+    @property
+    def num_edges_by_kind(self):
+        if 'kind' not in self._columns:
+            return {None: self._num_edges} if self._num_edges else {}
+        return dict(Counter(self.column('kind').tolist()))
+
+    @property
+    def directed(self):
+        return self._directed
+
+    @property
+    def offsets(self):
+        return self._offsets
+
+    @property
+    def targets(self):
+        return self._targets
+
+    @property
+    def edge_ids(self):
+        return self._edge_ids
+
+    @property
+    def attr_names(self):
+        return tuple(self._columns)
+
+    @property
+    def nbytes(self):
+        return (self._offsets.nbytes + self._targets.nbytes + self._edge_ids.nbytes
+                + sum(column.nbytes for column in self._columns.values()))
+
+    def column(self, name):
+        column = self._columns[name]
+        if column.categories is not None:
+            categories = np.empty(len(column.categories), dtype=object)
+            categories[:] = column.categories
+            values = categories[column.values]
+            if column.present is not None:
+                values[~column.present] = None
+            return values
+        return column.values
+
+    def _kind_mask(self, kind):
+        if 'kind' not in self._columns:
+            return np.full(self._num_edges, kind is None)
+        return self.column('kind') == kind
+
+    def out_degree(self, node, kind=None):
+        if not self.contains_node(node):
+            raise ValueError(f'Node {node} does not exist in this graph')
+        from_id = self._index[node]
+        lo, hi = self._offsets[from_id], self._offsets[from_id + 1]
+        if kind is None:
+            return int(hi - lo)
+        return int(np.count_nonzero(self._kind_mask(kind)[self._edge_ids[lo:hi]]))
+
+    def in_degree(self, node, kind=None):
+        if not self._directed:
+            return self.out_degree(node, kind)
+        if not self.contains_node(node):
+            raise ValueError(f'Node {node} does not exist in this graph')
+        return int(self._in_degrees(kind)[self._index[node]])
+
+    def _in_degrees(self, kind=None):
+        if kind not in self._in_degree_cache:
+            targets = self._targets
+            if kind is not None:
+                targets = targets[self._kind_mask(kind)[self._edge_ids]]
+            self._in_degree_cache[kind] = np.bincount(targets, minlength=len(self._nodes))
+        return self._in_degree_cache[kind]
+
+    def degree(self, node, kind=None):
+        if not self._directed:
+            return self.out_degree(node, kind)
+        return self.out_degree(node, kind) + self.in_degree(node, kind)
+
+    def degree_distribution(self):
+        degrees = np.diff(self._offsets)
+        if self._directed:
+            degrees = degrees + self._in_degrees()
+        return Counter({degree: int(count) for degree, count
+                        in enumerate(np.bincount(degrees).tolist()) if count})
+
+    @property
+    def node_index(self):
+        return self._node_index
+
+    @property
+    def version(self):
+        return 0
+
+    def node_id(self, node):
+        return self._index[node]
+
+    def contains_node(self, node):
+        return node in self._index
+
+    def contains_edge(self, edge):
+        from_node, to_node = Graph._nodes_of(edge)
+        if from_node not in self._index or to_node not in self._index:
+            return False
+        return self._slot_of(self._index[from_node], self._index[to_node]) is not None
+
+    def _slot_of(self, from_id, to_id):
+        lo, hi = self._offsets[from_id], self._offsets[from_id + 1]
+        matches = np.flatnonzero(self._targets[lo:hi] == to_id)
+        return lo + matches[0] if len(matches) else None
+
+    def _attrs_of(self, edge_id):
+        attrs = {}
+        for name, column in self._columns.items():
+            value = column.get(edge_id)
+            if value is not _MISSING:
+                attrs[name] = value
+        return attrs
+
+    def _edge_of(self, from_node, to_id, edge_id, cursor=None):
+        if cursor is not None:
+            return cursor._move_to_id(from_node, self._nodes[to_id], edge_id)
+        return _Edge(from_node, self._nodes[to_id], _EdgeAttrs(self._columns, edge_id))
+
+    def _edges_in(self, from_id, lo, hi, cursor=None):
+        from_node, nodes, columns = self._nodes[from_id], self._nodes, self._columns
+        pairs = zip(self._targets[lo:hi].tolist(), self._edge_ids[lo:hi].tolist())
+        if cursor is not None:
+            for to_id, edge_id in pairs:
+                yield cursor._move_to_id(from_node, nodes[to_id], edge_id)
+        else:
+            for to_id, edge_id in pairs:
+                yield _Edge(from_node, nodes[to_id], _EdgeAttrs(columns, edge_id))
+
+    def iter_edges(self, borrowed=False):
+        cursor = _CompactEdgeCursor(self._columns) if borrowed else None
+        edge_seen = np.zeros(self._num_edges, dtype=bool)
+        offsets = self._offsets.tolist()
+        targets = self._targets.tolist()
+        edge_ids = self._edge_ids.tolist()
+        for from_id, from_node in enumerate(self._nodes):
+            for slot in range(offsets[from_id], offsets[from_id + 1]):
+                edge_id = edge_ids[slot]
+                if not edge_seen[edge_id]:
+                    edge_seen[edge_id] = True
+                    yield self._edge_of(from_node, targets[slot], edge_id, cursor)
+
+    def edges_at(self, slots):
+        slots = np.asarray(slots, dtype=np.int64)
+        from_ids = np.searchsorted(self._offsets, slots, side='right') - 1
+        return [
+            self._edge_of(self._nodes[from_id], to_id, edge_id)
+            for from_id, to_id, edge_id in zip(from_ids.tolist(), self._targets[slots].tolist(),
+                                               self._edge_ids[slots].tolist())
+        ]
+
+    def get_edge_attrs(self, edge):
+        if not self.contains_edge(edge):
+            raise ValueError(f'Edge {edge} does not exist')
+        from_node, to_node = Graph._nodes_of(edge)
+        slot = self._slot_of(self._index[from_node], self._index[to_node])
+        return self._attrs_of(self._edge_ids[slot])
+
+    def _children_for(self, node_index, predicate=None):
+        from_id = self._index[node_index]
+        lo, hi = self._offsets[from_id], self._offsets[from_id + 1]
+        nodes = self._nodes
+        children = [nodes[to_id] for to_id in self._targets[lo:hi].tolist()]
+        if predicate is None:
+            return children
+        return (node for node in children if predicate(node))
+
+    def levels(self, start, deg=None, predicate=None):
+        if predicate is not None:
+            return Graph.levels(self, start, deg, predicate)
+        if not self.contains_node(start):
+            raise ValueError(f'Node {start} does not exist in this graph')
+        if deg is not None and deg < 1:
+            raise ValueError('Deg must be >= 1')
+
+        level_of = np.full(len(self._nodes), -1, dtype=np.int64)
+        frontier = np.array([self._index[start]], dtype=np.int64)
+        level_of[frontier] = 0
+        levels = [[start]]
+        child_counts = {}
+
+        while len(frontier) and (deg is None or len(levels) <= deg):
+            this_level = len(levels) - 1
+            starts = self._offsets[frontier]
+            counts = self._offsets[frontier + 1] - starts
+            first_slots = np.cumsum(counts) - counts
+            children = self._targets[np.arange(counts.sum()) + np.repeat(starts - first_slots, counts)]
+
+            child_levels = level_of[children]
+            parents = np.repeat(np.arange(len(frontier)), counts)
+            n_children = np.bincount(parents[child_levels != this_level], minlength=len(frontier))
+            child_counts.update(zip(self._node_index.nodes_of(frontier), n_children.tolist()))
+
+            unvisited = children[child_levels < 0]
+            _, first = np.unique(unvisited, return_index=True)
+            frontier = unvisited[np.sort(first)]
+            level_of[frontier] = this_level + 1
+            levels.append(self._node_index.nodes_of(frontier))
+
+        return Levels(levels, child_counts)
+
+    children = Graph.children
+    _levels_with_dups = Graph._levels_with_dups
+
+    def outbound_edges(self, from_node, borrowed=False):
+        if not self.contains_node(from_node):
+            raise ValueError(f'Node {from_node} does not exist in this graph')
+        from_id = self._index[from_node]
+        cursor = _CompactEdgeCursor(self._columns) if borrowed else None
+        return self._edges_in(from_id, self._offsets.item(from_id), self._offsets.item(from_id + 1), cursor)
+
+
+def _build_columns(edge_attrs):
+    names = list(dict.fromkeys(name for attrs in edge_attrs for name in attrs))
+    return {
+        name: _Column.build([attrs.get(name, _MISSING) for attrs in edge_attrs])
+        for name in names
+    }
@@ -1,161 +1,317 @@
 import itertools
 import math
+import weakref
 
 import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import LineCollection
 from matplotlib.colors import to_rgba
 from matplotlib.animation import FuncAnimation
 
+from network.nodeindex import NodeIndex
 from network.randoms import fixed_random
 
+_layouts = weakref.WeakKeyDictionary()
+MAX_CACHED_LAYOUTS = 8
 
-def _spans(graph, start):
+EDGE_BACKENDS = ('quiver', 'lines')
+
+
+def _spans(graph, start, levels=None):
+    levels = levels or graph.levels(start)
     yield {start: 1.0}
-    child_iter = graph.children(start, deg=None)
-    for nodes in child_iter:
+    for nodes in levels.levels[1:]:
         if not nodes:
             break
-        node_set = set(nodes)
-        sum_dict = {node: 1 + len([child for child
-                                   in next(graph.children(node, deg=1))
-                                   if child not in node_set])
-                    for node in nodes}
+        sum_dict = {node: 1 + levels.child_counts[node] for node in nodes}
         total_sum = sum(sum_dict.values())
         yield {node: sum_dict[node] / total_sum for node in nodes}
 
 
-def radial_positions(graph, start):
-    random = fixed_random()
-    spans = list(_spans(graph, start))
-    min_R = 0
-    dR = 100
-    for lev_spans in spans:
-        dR_adjustment = math.sqrt(
-            len(lev_spans) * len(spans) / len(graph.nodes)
-        )
-        max_R = min_R + dR * dR_adjustment
+class RadialPositions:
+    def __call__(self, graph, start):
+        return self.layout(graph, start).items()
+
+    def layout(self, graph, start):
+        rng = np.random.default_rng(fixed_random().getrandbits(64))
+        return self._layout(graph, start, rng, np.empty(0))
+
+    def update(self, graph, start, layout):
+        if not graph.directed and layout.state.get('start') == start:
+            return self._place_new(graph, layout)
+        return self._layout(graph, start, layout.state['rng'], layout.state['fractions'])
+
+    def _layout(self, graph, start, rng, fractions):
+        levels = graph.levels(start)
+        nodes = [node for level in levels.levels for node in level]
+        ids = graph.node_index.ids_of(nodes)
+        fractions = RadialPositions._fractions(graph, rng, fractions, ids)
+
+        coords, ring = RadialPositions._positions(levels, nodes, fractions[ids], len(graph.nodes))
+        layout = Layout(nodes, coords, graph.version)
+        placed = np.zeros(len(graph.node_index), dtype=bool)
+        placed[ids] = True
+        layout.state.update(rng=rng, fractions=fractions, start=start, ring=ring,
+                            unplaced=set(graph.node_index.nodes_of(np.flatnonzero(~placed))))
+        return layout
+
+    def _place_new(self, graph, layout):
+        state = layout.state
+        unplaced = state['unplaced'] | set(graph.node_index.nodes[len(state['fractions']):])
+        nodes, coords = list(layout.nodes), [layout.coords]
+        placed = {}
+        while True:
+            wave = {}
+            for node in sorted(unplaced, key=graph.node_index.__getitem__):
+                for edge in graph.outbound_edges(node, borrowed=True):
+                    if edge.to_node in layout or edge.to_node in placed:
+                        wave[node] = edge.to_node
+                        break
+            if not wave:
+                break
+            unplaced = unplaced - wave.keys()
+            ids = graph.node_index.ids_of(wave)
+            fractions = RadialPositions._fractions(graph, state['rng'], state['fractions'], ids)
+            parents = np.array([placed[parent] if parent in placed else layout[parent]
+                                for parent in wave.values()]).reshape(-1, 2)
+            radius = np.hypot(parents[:, 0], parents[:, 1])
+            theta = np.where(radius > 0, np.arctan2(parents[:, 1], parents[:, 0]),
+                             2 * math.pi * fractions[ids])
+            r = radius + state['ring'] * (0.5 + fractions[ids] / 2)
+            theta = theta + (fractions[ids] - 0.5) * state['ring'] / r
+            xy = np.column_stack([r * np.cos(theta), r * np.sin(theta)])
+            placed.update(zip(wave, map(tuple, xy.tolist())))
+            nodes.extend(wave)
+            coords.append(xy)
+            state = dict(state, fractions=fractions)
+
+        updated = Layout(nodes, np.concatenate(coords), graph.version)
+        updated.state.update(state, unplaced=unplaced)
+        return updated
+
+    @staticmethod
+    def _fractions(graph, rng, fractions, ids):
+        fractions = np.concatenate([fractions, np.full(len(graph.node_index) - len(fractions), np.nan)])
+        missing = ids[np.isnan(fractions[ids])]
+        fractions[missing] = rng.random(len(missing))
+        return fractions
+
+    @staticmethod
+    def _positions(levels, nodes, fractions, n_nodes):
+        sizes = np.array([len(level) for level in levels.levels if level])
+        level_of = np.repeat(np.arange(len(sizes)), sizes)
+        starts = np.cumsum(sizes) - sizes
+
+        child_counts = levels.child_counts
+        weights = 1 + np.fromiter(map(child_counts.get, nodes, itertools.repeat(0)), dtype=float,
+                                  count=len(nodes))
+        spans = weights / np.add.reduceat(weights, starts)[level_of]
+        cumulative = np.cumsum(spans)
+        theta = (cumulative - np.concatenate([[0], cumulative])[starts][level_of] - spans / 2) * 2 * math.pi
+
+        radii = np.concatenate([[0], np.cumsum(100 * np.sqrt(sizes * len(sizes) / n_nodes))])
+        min_r, max_r = radii[:-1][level_of], radii[1:][level_of]
+        r = np.where(min_r != 0, min_r + (max_r - min_r) * fractions, 0)
+        return np.column_stack([r * np.cos(theta), r * np.sin(theta)]), radii[-1] - radii[-2]
+
+
+radial_positions = RadialPositions()
+
+
+class Layout:
+    @classmethod
+    def from_positions(cls, positions, version=None):
+        nodes, coords = [], []
+        for node, xy in positions:
+            nodes.append(node)
+            coords.append(xy)
+        return cls(nodes, coords, version)
+
+    def __init__(self, nodes, coords, version=None, state=None):
+        self.index = nodes if isinstance(nodes, NodeIndex) else NodeIndex(nodes, frozen=True)
+        self.coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+        self.coords.flags.writeable = False
+        self.version = version
+        self.state = state or {}
+
+    @property
+    def nodes(self):
+        return self.index.nodes
 
-        min_theta = 0
-        for node, node_span in lev_spans.items():
-            max_theta = min_theta + node_span * 2 * math.pi
+    @property
+    def x(self):
+        return self.coords[:, 0]
+
+    @property
+    def y(self):
+        return self.coords[:, 1]
+
+    def xy(self, nodes):
+        return self.coords[self.index.ids_of(nodes)]
+
+    def items(self):
+        return zip(self.index, map(tuple, self.coords.tolist()))
 
-            r_pos = random.uniform(min_R, max_R) if min_R != 0 else 0
-            theta_pos = (min_theta + max_theta) / 2
-            x = r_pos * math.cos(theta_pos)
-            y = r_pos * math.sin(theta_pos)
-            yield node, (x, y)
+    def __getitem__(self, node):
+        return tuple(self.coords[self.index[node]])
 
-            min_theta = max_theta
+    def __contains__(self, node):
+        return node in self.index
 
-        min_R = max_R
+    def __len__(self):
+        return len(self.index)
 
+    def __iter__(self):
+        return iter(self.items())
 
-class _NodePoint:
-    def __init__(self, x, y, color):
-        self.x = x
-        self.y = y
-        self.color = color
 
+def layout_for(graph, start, position_func=None):
+    position_func = position_func or radial_positions
+    cached = _layouts.setdefault(graph, {})
+    key = (start, position_func)
+    layout = cached.pop(key, None)
+    if layout is not None and layout.version == graph.version:
+        cached[key] = layout
+        return layout
 
-class _EdgeLine:
-    def __init__(self, x1, y1, dx, dy, color, linewidth=None):
-        self.x1 = x1
-        self.y1 = y1
-        self.dx = dx
-        self.dy = dy
-        self.color = color
-        self.linewidth = linewidth or 1.0
+    if layout is not None and hasattr(position_func, 'update'):
+        layout = position_func.update(graph, start, layout)
+    elif hasattr(position_func, 'layout'):
+        layout = position_func.layout(graph, start)
+    else:
+        layout = Layout.from_positions(position_func(graph, start), graph.version)
+    layout.version = graph.version
+    cached[key] = layout
+    if len(cached) > MAX_CACHED_LAYOUTS:
+        del cached[next(iter(cached))]
+    return layout
 
 
 class GraphPlotter:
-    def __init__(self, graph, start, position_func=None):
+    def __init__(self, graph, start, position_func=None, node_color='blue', edge_color='black',
+                 edge_backend='quiver', layout=None):
+        if edge_backend not in EDGE_BACKENDS:
+            raise ValueError(f'edge_backend must be one of {EDGE_BACKENDS}')
         self._graph = graph
+        self._edge_backend = edge_backend
         self._start = start
         self._positions = position_func or radial_positions
-        self._node_map = dict(self._iter_nodepoints())
-        self._edge_map = dict(self._iter_edgelines())
+        self._layout = layout if layout is not None else layout_for(graph, start, self._positions)
+        self._rgba = {}
+        self._base_colors = (node_color, edge_color)
+
+        self._edges = list(graph.iter_edges())
+        self._edge_map = {edge.nodes: row for row, edge in enumerate(self._edges)}
+        from_ids = self._layout.index.ids_of(edge.from_node for edge in self._edges)
+        to_ids = self._layout.index.ids_of(edge.to_node for edge in self._edges)
+        self._edge_starts = self._layout.coords[from_ids]
+        self._edge_deltas = self._layout.coords[to_ids] - self._edge_starts
+        self._edge_strengths = np.array([np.nan if edge.attr('strength') is None else edge.attr('strength')
+                                         for edge in self._edges], dtype=float)
+
+        self._node_colors = np.tile(self._to_rgba(node_color), (len(self._layout), 1))
+        self._edge_colors = np.tile(self._to_rgba(edge_color), (len(self._edges), 1))
+        self._edge_linewidths = np.ones(len(self._edges))
+        self._visible_edges = np.arange(len(self._edges))
+        self._nodes_changed = True
+        self._edges_changed = True
         self._scat = None
-        self._quiver = None
+        self._edge_artist = None
 
     @property
     def artists(self):
-        return self._scat, self._quiver
+        return tuple(artist for artist in (self._scat, self._edge_artist) if artist is not None)
 
-    def _iter_nodepoints(self):
-        for node, (x, y) in self._positions(self._graph, self._start):
-            yield node, _NodePoint(x, y, color='blue')
+    @property
+    def visible_edges(self):
+        return [self._edges[row] for row in self._visible_edges.tolist()]
 
-    def _iter_edgelines(self):
-        for edge in self._graph.iter_edges():
-            start_pt = self._node_map[edge.from_node]
-            end_pt = self._node_map[edge.to_node]
-            x1, y1 = start_pt.x, start_pt.y
-            x2, y2 = end_pt.x, end_pt.y
+    @property
+    def layout(self):
+        return self._layout
 
-            yield edge, _EdgeLine(
-                x1, y1,
-                dx=(x2 - x1), dy=(y2 - y1),
-                color='black'
-            )
+    @property
+    def node_colors(self):
+        return self._node_colors
 
-    @staticmethod
-    def _patch_aligned(patch, edgeline):
-        edgecolor = patch.get_edgecolor()
-        facecolor = patch.get_facecolor()
-        return all([
-            to_rgba(edgecolor) == to_rgba(edgeline.color),
-            to_rgba(facecolor) == to_rgba(edgeline.color)
-        ])
+    @property
+    def edge_colors(self):
+        return self._edge_colors
+
+    def _to_rgba(self, color):
+        if color not in self._rgba:
+            self._rgba[color] = np.array(to_rgba(color))
+        return self._rgba[color]
+
+    def _edge_row(self, edge):
+        nodes = edge.nodes if hasattr(edge, 'nodes') else tuple(edge)
+        row = self._edge_map.get(nodes)
+        if row is None and not self._graph.directed:
+            row = self._edge_map.get(nodes[::-1])
+        if row is None:
+            raise KeyError(f'Edge {nodes} is not plotted')
+        return row
 
     def refresh(self, nodes=True, edges=True):
-        if nodes and self._scat is not None:
-            self._scat.set_facecolors(
-                tuple(pt.color for pt in self._node_map.values())
-            )
-
-        if edges and self._quiver is not None:
-            self._quiver.set_facecolors(
-                tuple(edge.color for edge in self._edge_map.values())
-            )
-            self._quiver.set_color(
-                tuple(to_rgba(edge.color) for edge in self._edge_map.values())
-            )
-
-    def plot_nodes(self, **additional_kw):
-        self._scat = plt.scatter(
-            tuple(pt.x for pt in self._node_map.values()),
-            tuple(pt.y for pt in self._node_map.values()),
-            c=tuple(pt.color for pt in self._node_map.values()),
-            **additional_kw
-        )
-
-    def plot_edges(self, linewidth=None):
-        x, y, u, v, colors, lws = tuple([] for _ in range(6))
-
-        for edge, edgeline in self._edge_map.items():
-            GraphPlotter._set_linewidth(edge, edgeline, linewidth)
-            x.append(edgeline.x1)
-            y.append(edgeline.y1)
-            u.append(edgeline.dx)
-            v.append(edgeline.dy)
-            colors.append(edgeline.color)
-            lws.append(edgeline.linewidth)
-
-        self._quiver = plt.quiver(x, y, u, v, angles='xy', scale_units='xy', scale=1,
-                                  **GraphPlotter._generate_quiver_kw(lws, colors))
+        if nodes and self._nodes_changed and self._scat is not None:
+            self._scat.set_facecolors(self._node_colors)
+            self._nodes_changed = False
+
+        if edges and self._edges_changed and self._edge_artist is not None:
+            self._edge_artist.set_color(self._edge_colors[self._visible_edges])
+            self._edges_changed = False
+
+    def plot_nodes(self, ax=None, **additional_kw):
+        ax = plt.gca() if ax is None else ax
+        self._scat = ax.scatter(self._layout.x, self._layout.y, c=self._node_colors, **additional_kw)
+        self._nodes_changed = False
+
+    def plot_edges(self, linewidth=None, min_strength=None, max_edges=None, ax=None):
+        ax = plt.gca() if ax is None else ax
+        self._set_linewidths(linewidth)
+        self._visible_edges = self._level_of_detail(min_strength, max_edges)
+        rows = self._visible_edges
+        colors = self._edge_colors[rows]
+
+        if self._edge_backend == 'lines':
+            starts = self._edge_starts[rows]
+            segments = np.stack([starts, starts + self._edge_deltas[rows]], axis=1)
+            self._edge_artist = LineCollection(segments, linewidths=self._edge_linewidths[rows],
+                                               colors=colors)
+            ax.add_collection(self._edge_artist)
+            ax.autoscale_view()
+        else:
+            x, y = self._edge_starts[rows].T
+            u, v = self._edge_deltas[rows].T
+            self._edge_artist = ax.quiver(x, y, u, v, angles='xy', scale_units='xy', scale=1,
+                                          **GraphPlotter._generate_quiver_kw(self._edge_linewidths[rows],
+                                                                             colors))
+        self._edges_changed = False
+
+    def _level_of_detail(self, min_strength, max_edges):
+        rows = np.arange(len(self._edges))
+        strengths = self._edge_strengths
+        if min_strength is not None:
+            rows = rows[np.isnan(strengths) | (strengths >= min_strength)]
+        if max_edges is not None and len(rows) > max_edges:
+            ranked = np.argsort(-np.nan_to_num(strengths[rows], nan=np.inf), kind='stable')
+            rows = np.sort(rows[ranked[:max_edges]])
+        return rows
 
     @staticmethod
     def _generate_quiver_kw(lws, colors):
         # HACK: reducing width and increasing lw param allows lw < 1.0 to be plotted
         factor = 200
         width = 0.005 / factor
-        if not lws:
-            lws = None
+        if not len(lws):
+            lw = None
             min_lw = 1.0
         else:
+            lw = list(lws)
             min_lw = min(lws)
 
         return dict(
-            lw=lws * factor,
+            lw=lw,
             edgecolors=colors,
             color=colors,
             width=width,
@@ -164,35 +320,79 @@ class GraphPlotter:
             headaxislength=3.5 * factor * min_lw
         )
 
-    @staticmethod
-    def _set_linewidth(edge, edgeline, linewidth):
-        if linewidth is not None:
-            if edge.attr('strength') is not None and isinstance(linewidth, tuple):
-                minwidth, maxwidth = linewidth
-                edgeline.linewidth = edge.attr('strength') * (maxwidth - minwidth) + minwidth
-            else:
-                edgeline.linewidth = linewidth
+    def _set_linewidths(self, linewidth):
+        if linewidth is None:
+            return
+        if isinstance(linewidth, tuple):
+            minwidth, maxwidth = linewidth
+            strengths = self._edge_strengths
+            self._edge_linewidths[:] = np.where(np.isnan(strengths), minwidth,
+                                                strengths * (maxwidth - minwidth) + minwidth)
+        else:
+            self._edge_linewidths[:] = linewidth
+
+    def reset_colors(self):
+        node_color, edge_color = self._base_colors
+        self._node_colors[:] = self._to_rgba(node_color)
+        self._edge_colors[:] = self._to_rgba(edge_color)
+        self._nodes_changed = True
+        self._edges_changed = True
 
     def set_node(self, node, new_color):
-        self._node_map[node].color = new_color
+        self._node_colors[self._layout.index[node]] = self._to_rgba(new_color)
+        self._nodes_changed = True
+
+    def set_nodes(self, nodes, new_color):
+        self._node_colors[self._layout.index.ids_of(nodes)] = self._to_rgba(new_color)
+        self._nodes_changed = True
 
     def set_edge(self, edge, new_color):
-        edgeline = self._edge_map[edge]
-        edgeline.color = new_color
+        self._edge_colors[self._edge_row(edge)] = self._to_rgba(new_color)
+        self._edges_changed = True
+
+    def edge_rows(self, edges):
+        return np.fromiter((self._edge_row(edge) for edge in edges), dtype=np.int64)
+
+    def set_edges(self, edges, new_color):
+        self._edge_colors[self.edge_rows(edges)] = self._to_rgba(new_color)
+        self._edges_changed = True
+
+    def mark_path(self, path, color, edges=True):
+        path_edges = [edge for segment in path for edge in segment]
+        if not path_edges:
+            return
+        if edges:
+            self.set_edges(path_edges, color)
+        self.set_nodes([edge.from_node for edge in path_edges] + [edge.to_node for edge in path_edges], color)
+
+    def mark_frames(self, node_frames, edge_frames, stop, color, start=0, edges=True):
+        nodes = (node_frames >= start) & (node_frames < stop)
+        if nodes.any():
+            self._node_colors[nodes] = self._to_rgba(color)
+            self._nodes_changed = True
+        if edges:
+            marked = (edge_frames >= start) & (edge_frames < stop)
+            if marked.any():
+                self._edge_colors[marked] = self._to_rgba(color)
+                self._edges_changed = True
 
 
 class GraphDrawer:
-    def __init__(self, graph, positions_func=None):
+    def __init__(self, graph, positions_func=None, edge_backend='quiver'):
         self.graph = graph
         self._positions = positions_func
+        self._edge_backend = edge_backend
 
-    def _generate_plotter(self, start):
-        return GraphPlotter(self.graph, start, self._positions)
+    def _generate_plotter(self, start, layout=None):
+        return GraphPlotter(self.graph, start, self._positions, edge_backend=self._edge_backend,
+                            layout=layout)
 
-    def draw(self, start, s=40, linewidth=1, arrows=True, plotter_inst=None):
+    def draw(self, start, s=40, linewidth=1, arrows=True, plotter_inst=None,
+             min_strength=None, max_edges=None, ax=None):
         plotter = plotter_inst or self._generate_plotter(start)
-        plotter.plot_nodes(s=s)
-        plotter.plot_edges(linewidth=linewidth) if arrows else []
+        plotter.plot_nodes(ax=ax, s=s)
+        if arrows:
+            plotter.plot_edges(linewidth=linewidth, min_strength=min_strength, max_edges=max_edges, ax=ax)
         return plotter
 
     @property
@@ -204,36 +404,43 @@ class GraphAnimator:
     def __init__(self, drawer):
         self.drawer = drawer
         self._plotter = None
+        self._frame_plotter = None
+        self._frame_key = None
+        self._marked = 0
 
     def frame(self, n, simulation, marked_color='red', arrows=True, **draw_kw):
-        plotter = self.drawer._generate_plotter(simulation.originating_node)
-
-        for segment in simulation.path(n):
-            for edge in segment:
-                if arrows:
-                    plotter.set_edge(edge, marked_color)
-                plotter.set_node(edge.from_node, marked_color)
-                plotter.set_node(edge.to_node, marked_color)
+        plotter = self._frame_plotter
+        if plotter is None or self._frame_key[0] is not simulation:
+            plotter = self.drawer._generate_plotter(simulation.originating_node)
+            self._frame_plotter, self._frame_key, self._marked = plotter, (simulation, None), 0
+        if n is not None and n < self._marked:
+            plotter.reset_colors()
+            self._marked = 0
+
+        segments = list(itertools.islice(simulation.path(n), self._marked, None))
+        plotter.mark_path(segments, marked_color, edges=arrows)
+        self._marked += len(segments)
+
+        options = (arrows, draw_kw)
+        artist = plotter.artists[0] if plotter.artists else None
+        if artist is None or artist.axes is None or artist.figure is not plt.gcf() \
+                or self._frame_key[1] != options:
+            self._frame_key = (simulation, options)
+            return self.drawer.draw(simulation.originating_node,
+                                    plotter_inst=plotter, arrows=arrows, **draw_kw)
         plotter.refresh()
-
-        return self.drawer.draw(simulation.originating_node,
-                                plotter_inst=plotter, arrows=arrows, **draw_kw)
+        return plotter
 
     def __call__(self, simulation, fig=None,
                  every=3, max_frames=None,
                  marked_color='red', arrows=True,
-                 repeat_delay=10, **draw_kw):
+                 repeat_delay=10, blit=False, **draw_kw):
 
         def update(path):
             if not path:
                 self._plotter.set_node(simulation.originating_node, marked_color)
             else:
-                for segment in path:
-                    for edge in segment:
-                        if arrows:
-                            self._plotter.set_edge(edge, marked_color)
-                        self._plotter.set_node(edge.from_node, marked_color)
-                        self._plotter.set_node(edge.to_node, marked_color)
+                self._plotter.mark_path(path, marked_color, edges=arrows)
             self._plotter.refresh()
             return self._plotter.artists
 
@@ -249,7 +456,7 @@ class GraphAnimator:
 
         return FuncAnimation(fig or plt.gcf(), update,
                              frames=gen_func, init_func=init,
-                             blit=False, repeat_delay=repeat_delay)
+                             blit=blit, repeat_delay=repeat_delay)
 
 
 def chunks(iterable, n):
@@ -1,8 +1,11 @@
 import math
-import random
-from itertools import combinations, product
+import random as default_random
+from itertools import combinations, product, repeat
 
-from network.draw import GraphDrawer
+import numpy as np
+
+from network.compact import CompactGraph, _Column
+from network.draw import GraphDrawer, Layout
 from network.graph import Graph
 from network.randoms import fixed_random
 
@@ -10,7 +13,7 @@ from network.randoms import fixed_random
 def community_graph(n_communities, community_size, orphans,
                     n_strong_conns, n_weak_conns, *,
                     core_kw=None, strong_kw=None, weak_kw=None,
-                    graph_fun=None):
+                    graph_fun=None, random=None):
 
     def _get_kw_func(kw):
         if not kw:
@@ -34,26 +37,210 @@ def community_graph(n_communities, community_size, orphans,
     for edge in core_edges:
         g.add_edge(edge, kind='core', **core_kw())
 
-    for strong_edge in generate_edges(g, n_strong_conns):
+    for strong_edge in generate_edges(g, n_strong_conns, random):
         g.add_edge(strong_edge, kind='strong', **strong_kw())
 
-    for weak_edge in generate_edges(g, n_weak_conns):
+    for weak_edge in generate_edges(g, n_weak_conns, random):
         g.add_edge(weak_edge, kind='weak', **weak_kw())
 
     return g, node_community_map
 
 
-def generate_edges(graph, n):
+EDGE_KINDS = ('core', 'strong', 'weak')
+
+
+def compact_community_graph(n_communities, community_size, orphans,
+                            n_strong_conns, n_weak_conns, *,
+                            core_kw=None, strong_kw=None, weak_kw=None,
+                            degree_weights=None, block_matrix=None, random=None):
+    random = random or default_random
+    rng = np.random.default_rng(random.getrandbits(64))
+
+    n_members = n_communities * community_size
+    total_ppl = n_members + orphans
+    bounds = np.append(np.arange(n_communities + 1) * community_size, total_ppl)
+    sampler = _endpoint_sampler(total_ppl, bounds, degree_weights, block_matrix)
+
+    first, second = np.triu_indices(community_size, 1)
+    offsets = np.arange(n_communities)[:, None] * community_size
+    core = ((offsets + first) * total_ppl + offsets + second).ravel()
+    strong = _sample_pairs(sampler, rng, n_strong_conns, total_ppl, core)
+    weak = _sample_pairs(sampler, rng, n_weak_conns, total_ppl, _sorted_unique(np.concatenate([core, strong])))
+
+    groups = [(core_kw, len(core)), (strong_kw, len(strong)), (weak_kw, len(weak))]
+    keys = np.concatenate([core, strong, weak])
+    kinds = np.repeat(np.arange(len(EDGE_KINDS), dtype=np.int32), [n for _, n in groups])
+    g = CompactGraph.from_arrays(range(total_ppl), keys // total_ppl, keys % total_ppl, False,
+                                 kind=_Column(kinds, None, EDGE_KINDS), **_edge_columns(groups, random))
+
+    node_community_map = NodeCommunityMap(zip(range(n_members),
+                                              (np.arange(n_members) // community_size).tolist()))
+    return g, node_community_map
+
+
+def _endpoint_sampler(n_nodes, bounds, degree_weights=None, block_matrix=None):
+    weights = np.ones(n_nodes) if degree_weights is None else np.asarray(degree_weights, dtype=float)
+    if weights.shape != (n_nodes,):
+        raise ValueError('degree_weights must have one weight per node')
+    cumulative = np.concatenate([[0], np.cumsum(weights)])
+    support = np.flatnonzero(weights > 0)
+
+    def nodes_at(u):
+        if degree_weights is None:
+            return np.minimum(u.astype(np.int64), n_nodes - 1)
+        return np.minimum(np.searchsorted(cumulative, u, side='right') - 1, n_nodes - 1)
+
+    if block_matrix is None:
+        return (lambda rng, size: nodes_at(rng.random((2, size)) * cumulative[-1]),
+                lambda i, j: weights[i] * weights[j], support)
+
+    mass = cumulative[bounds[1:]] - cumulative[bounds[:-1]]
+    if not mass[-1]:
+        mass = mass[:-1]
+    block_matrix = np.asarray(block_matrix, dtype=float)
+    if block_matrix.shape != (len(mass), len(mass)):
+        raise ValueError(f'block_matrix must be {len(mass)}x{len(mass)}, one row per community and orphans')
+    rates = np.cumsum(block_matrix * mass[:, None] * mass[None, :])
+    block_of = np.searchsorted(bounds, np.arange(n_nodes), side='right') - 1
+
+    def draw(rng, size):
+        pairs = np.minimum(np.searchsorted(rates, rng.random(size) * rates[-1], side='right'), len(rates) - 1)
+        blocks = np.stack(np.divmod(pairs, len(mass)))
+        lo = cumulative[bounds[blocks]]
+        return nodes_at(lo + rng.random((2, size)) * (cumulative[bounds[blocks + 1]] - lo))
+
+    def pair_weights(i, j):
+        blocks_i, blocks_j = block_of[i], block_of[j]
+        return weights[i] * weights[j] * (block_matrix[blocks_i, blocks_j] + block_matrix[blocks_j, blocks_i])
+
+    return draw, pair_weights, support
+
+
+def _sample_pairs(sampler, rng, n, n_nodes, existing):
+    n_combos_exist = n_nodes * (n_nodes - 1) // 2 - len(existing)
+    if n > n_combos_exist:
+        raise ValueError('Too many outbound connections per node to generate edges')
+    if 2 * n > n_combos_exist:
+        return _enumerated_pairs(sampler, rng, n, n_nodes, existing)
+
+    draw = sampler[0]
+    chosen = np.empty(0, dtype=np.int64)
+    stalled = 0
+    while len(chosen) < n:
+        needed = n - len(chosen)
+        i, j = draw(rng, needed + needed // 4 + 16)
+        keys = np.sort((np.minimum(i, j) * n_nodes + np.maximum(i, j))[i != j])
+        merged = _sorted_unique(np.concatenate([chosen, keys[~_contains(existing, keys)]]))
+        stalled = stalled + 1 if len(merged) == len(chosen) else 0
+        if stalled > 100:
+            rest = _enumerated_pairs(sampler, rng, needed, n_nodes,
+                                     _sorted_unique(np.concatenate([existing, chosen])))
+            return _sorted_unique(np.concatenate([chosen, rest]))
+        chosen = merged
+    if len(chosen) > n:
+        chosen = np.sort(rng.choice(chosen, n, replace=False))
+    return chosen
+
+
+def _enumerated_pairs(sampler, rng, n, n_nodes, existing):
+    _, pair_weights, nodes = sampler
+    first, second = np.triu_indices(len(nodes), 1)
+    i, j = nodes[first], nodes[second]
+    keys = i * n_nodes + j
+    free = ~_contains(existing, keys)
+    keys, weights = keys[free], pair_weights(i[free], j[free])
+    if np.count_nonzero(weights) < n:
+        raise ValueError('Could not sample enough distinct edges from the given weights')
+    return np.sort(rng.choice(keys, n, replace=False, p=weights / weights.sum()))
+
+
+def _sorted_unique(keys):
+    keys = np.sort(keys, kind='stable')
+    return keys[np.concatenate([[True], keys[1:] != keys[:-1]])]
+
+
+def _contains(sorted_keys, keys):
+    if not len(sorted_keys):
+        return np.zeros(len(keys), dtype=bool)
+    found = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+    return sorted_keys[found] == keys
+
+
+def _edge_columns(groups, random):
+    groups = [(_group_kw(kw, n), n) for kw, n in groups]
+    names = dict.fromkeys(name for kw, _ in groups for row in (kw if isinstance(kw, list) else [kw])
+                          for name in row)
+    columns = {}
+    for name in names:
+        values, present = [], []
+        for kw, n in groups:
+            if isinstance(kw, list):
+                row_values = [row.get(name) for row in kw]
+                values.append(np.asarray([0 if value is None else value for value in row_values]))
+                present.append(np.array([value is not None for value in row_values], dtype=bool))
+                continue
+            value = kw.get(name)
+            if value is None:
+                values.append(np.zeros(n))
+            elif hasattr(value, 'sample'):
+                values.append(np.asarray(value.sample(n, random)))
+            else:
+                values.append(np.broadcast_to(np.asarray(value), (n,)))
+            present.append(np.full(n, value is not None))
+        present = np.concatenate(present)
+        columns[name] = _Column(np.concatenate(values), None if present.all() else present)
+    return columns
+
+
+def _group_kw(kw, n):
+    if not callable(kw):
+        return kw or {}
+    if not n:
+        return {}
+    first = kw()
+    if first and all(hasattr(value, 'sample') for value in first.values()):
+        return first
+    return [first] + [kw() for _ in range(n - 1)]
+
+
+def generate_edges(graph, n, random=None):
     if graph.directed:
         raise ValueError('Graph must be undirected')
+    random = random or default_random
 
-    n_nodes = len(graph.nodes)
+    nodes = list(graph.nodes)
+    n_nodes = len(nodes)
     n_existing_edges = graph.num_edges
     n_combos_exist = int(n_nodes * (n_nodes - 1) / 2 - n_existing_edges)
 
     if n > n_combos_exist:
         raise ValueError('Too many outbound connections per node to generate edges')
 
+    if 2 * n > n_combos_exist:
+        yield from _enumerated_edges(graph, n, n_combos_exist, random)
+        return
+
+    chosen = set()
+    while len(chosen) < n:
+        i = random.randrange(n_nodes)
+        j = random.randrange(n_nodes)
+        if i == j:
+            continue
+        pair = (i, j) if i < j else (j, i)
+        nodes_pair = (nodes[pair[0]], nodes[pair[1]])
+        if pair in chosen or graph.contains_edge(nodes_pair):
+            continue
+        chosen.add(pair)
+        yield nodes_pair
+
+
+def regenerate_edges(graph, kind, random=None, **attrs):
+    removed = graph.remove_edges(of_kind=kind)
+    graph.add_edges(list(generate_edges(graph, len(removed), random)), kind=kind, **attrs)
+    return removed
+
+
+def _enumerated_edges(graph, n, n_combos_exist, random):
     chosen_indices = set(random.sample(range(n_combos_exist), n))
     pool = (c for c in combinations(graph.nodes, 2) if not graph.contains_edge(c))
 
@@ -118,29 +305,58 @@ class CommunityNodePositions:
         self._random = random_ or fixed_random()
         self.rfactor = rfactor
 
-    def _ctr_coords_for(self, sq):
-        x, y = sq
-        return self.r * (2 * x + 1), self.r * (2 * y + 1)
-
-    def _random_coord_within(self, sq):
-        x0, y0 = self._ctr_coords_for(sq)
-        # dr = random.gauss(mu=0, sigma=self.r * 1.5)
-        dr = self.r * self.rfactor * self._random.betavariate(1.33, 1.33)
-        dtheta = self._random.uniform(0, 2 * math.pi)
-        dx = dr * math.cos(dtheta)
-        dy = dr * math.sin(dtheta)
-        return x0 + dx, y0 + dy
-
-    def __call__(self, graph, start):
+    def _squares(self):
         self._random.seed(0)
         grid = list(product(range(self.side_len), range(self.side_len)))
-        selected_sq = list(self._random.sample(grid, self.n_comm))
-        not_selected = [sq for sq in grid if sq not in selected_sq]
+        selected_sq = self._random.sample(grid, self.n_comm)
+        chosen = set(selected_sq)
+        not_selected = [sq for sq in grid if sq not in chosen]
+        streams = np.random.SeedSequence(self._random.getrandbits(64)).spawn(3)
+        return (np.array(selected_sq, dtype=float).reshape(-1, 2),
+                np.array(not_selected, dtype=float).reshape(-1, 2),
+                [np.random.default_rng(stream) for stream in streams])
+
+    def _positions_of(self, nodes, selected_sq, not_selected, streams):
+        radius_rng, angle_rng, square_rng = streams
+        comm = np.fromiter(map(self.node_community_map.get, nodes, repeat(-1)), dtype=np.int64,
+                           count=len(nodes))
+        orphans = comm < 0
+
+        squares = np.empty((len(nodes), 2))
+        squares[~orphans] = selected_sq[comm[~orphans]]
+        picks = square_rng.random(np.count_nonzero(orphans)) * len(not_selected)
+        squares[orphans] = not_selected[picks.astype(np.int64)]
+
+        dr = self.r * self.rfactor * radius_rng.beta(1.33, 1.33, len(nodes))
+        dtheta = angle_rng.uniform(0, 2 * math.pi, len(nodes))
+        return self.r * (2 * squares + 1) + dr[:, None] * np.column_stack([np.cos(dtheta), np.sin(dtheta)])
 
-        for node in graph.nodes:
-            if node in self.node_community_map:
-                comm = self.node_community_map[node]
-                yield node, self._random_coord_within(selected_sq[comm])
-            else:
-                random_sq = self._random.choice(not_selected)
-                yield node, self._random_coord_within(random_sq)
\ No newline at end of file
+    def __call__(self, graph, start):
+        return self.layout(graph, start).items()
+
+    def layout(self, graph, start):
+        selected_sq, not_selected, streams = self._squares()
+        nodes = list(graph.nodes)
+        layout = Layout(nodes, self._positions_of(nodes, selected_sq, not_selected, streams), graph.version)
+        layout.state.update(squares=(selected_sq, not_selected), streams=_stream_states(streams))
+        return layout
+
+    def update(self, graph, start, layout):
+        new_nodes = [node for node in graph.nodes if node not in layout]
+        if not new_nodes:
+            return Layout(layout.index, layout.coords, graph.version, layout.state)
+
+        streams = [np.random.default_rng(_restore(state)) for state in layout.state['streams']]
+        added = self._positions_of(new_nodes, *layout.state['squares'], streams)
+        return Layout(layout.nodes + tuple(new_nodes), np.vstack([layout.coords, added]), graph.version,
+                      dict(layout.state, streams=_stream_states(streams)))
+
+
+def _stream_states(streams):
+    return [rng.bit_generator.state for rng in streams]
+
+
+def _restore(state):
+    bit_generator = np.random.PCG64()
+    bit_generator.state = state
+    return bit_generator
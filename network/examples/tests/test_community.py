@@ -1,8 +1,16 @@
+import random
 import unittest
+from itertools import combinations
 
-from network.examples.community import NodeCommunityMap, communities, generate_edges
+import numpy as np
+import pytest
+
+from network.draw import layout_for
+from network.examples.community import NodeCommunityMap, CommunityNodePositions, communities, \
+    compact_community_graph, generate_edges, regenerate_edges
 from network.graph import Graph
 from network.randoms import fix_random
+from network.simulation import rv
 
 
 def test__should_generate_community_edges_and_map():
@@ -22,19 +30,126 @@ def test__should_generate_community_edges_and_map():
 
 def test__should_generate_community_outbound_edges():
     edges, ncmap = communities(n_communities=3, community_size=3)
-    g = Graph()
+    g = Graph(directed=False)
     for edge in edges:
         g.add_edge(edge)
 
     with fix_random():
-        new_edges = generate_edges(g, 5)
-        assert list(new_edges) == [
-            (0, 5), (5, 0),
-            (1, 5), (5, 1),
-            (2, 4), (4, 2),
-            (2, 6), (6, 2),
-            (4, 8), (8, 4)
-        ]
+        new_edges = list(generate_edges(g, 5))
+    with fix_random():
+        assert list(generate_edges(g, 5)) == new_edges
+
+    assert len(new_edges) == 5
+    assert len({frozenset(edge) for edge in new_edges}) == 5
+    assert not any(g.contains_edge(edge) for edge in new_edges)
+
+
+def test__should_generate_edges_from_given_random():
+    g = Graph(range(50), directed=False)
+    first = list(generate_edges(g, 10, random.Random(5)))
+    assert list(generate_edges(g, 10, random.Random(5))) == first
+
+
+def test__should_generate_all_remaining_edges_when_dense():
+    g = Graph(range(5), directed=False)
+    g.add_edge((0, 1))
+    remaining = list(generate_edges(g, 9))
+    assert sorted(remaining) == [edge for edge in combinations(range(5), 2) if edge != (0, 1)]
+
+
+def test__should_not_generate_more_edges_than_available():
+    g = Graph(range(4), directed=False)
+    g.add_edge((0, 1))
+    with pytest.raises(ValueError):
+        list(generate_edges(g, 6))
+    with pytest.raises(ValueError):
+        list(generate_edges(Graph(range(4)), 1))
+
+
+def test__should_regenerate_edges_of_kind():
+    g = Graph(range(30), directed=False)
+    g.add_edges([(0, 1), (1, 2)], kind='core', strength=0.6)
+    g.add_edges([(3, 4), (5, 6), (7, 8)], kind='weak', strength=0.1)
+
+    with fix_random():
+        removed = regenerate_edges(g, 'weak', strength=0.1)
+
+    assert [edge.nodes for edge in removed] == [(3, 4), (5, 6), (7, 8)]
+    assert len(list(g.edges_of_kind('weak'))) == 3
+    assert [edge.nodes for edge in g.edges_of_kind('core')] == [(0, 1), (1, 2)]
+    assert g.num_edges == 5
+
+
+def test__should_build_compact_community_graph():
+    g, ncmap = compact_community_graph(10, 3, 10, 40, 40, core_kw={'strength': 0.6},
+                                       strong_kw={'strength': 0.4}, random=random.Random(3))
+    assert g.num_edges_by_kind == {'core': 30, 'strong': 40, 'weak': 40}
+    assert ncmap == dict(zip(range(30), [node // 3 for node in range(30)]))
+    assert len(g.nodes) == 40
+
+    edges = [edge.nodes for edge in g.iter_edges()]
+    assert len({frozenset(edge) for edge in edges}) == 110
+    assert all(from_node != to_node for from_node, to_node in edges)
+    assert all(ncmap.is_same_community(*edge.nodes) for edge in g.iter_edges() if edge.attr('kind') == 'core')
+    assert g.get_edge_attrs((0, 1)) == {'kind': 'core', 'strength': 0.6}
+    assert 'strength' not in dict(next(edge for edge in g.iter_edges() if edge.attr('kind') == 'weak').attrs)
+
+    same, _ = compact_community_graph(10, 3, 10, 40, 40, core_kw={'strength': 0.6},
+                                      strong_kw={'strength': 0.4}, random=random.Random(3))
+    assert [edge.nodes for edge in same.iter_edges()] == edges
+
+
+def test__should_call_kw_factories_per_compact_edge():
+    strengths = iter(range(1, 100))
+    g, _ = compact_community_graph(3, 3, 0, 5, 0, core_kw=lambda: {'strength': next(strengths)},
+                                   strong_kw=lambda: {'strength': 0.5, 'note': 'x'}, random=random.Random(2))
+    core = [edge for edge in g.iter_edges() if edge.attr('kind') == 'core']
+    assert sorted(edge.attr('strength') for edge in core) == list(range(1, 10))
+    assert all(edge.attr('note') is None for edge in core)
+    assert all(edge.attr('strength') == 0.5 and edge.attr('note') == 'x'
+               for edge in g.iter_edges() if edge.attr('kind') == 'strong')
+
+
+def test__should_sample_kw_factory_columns_once_per_kind():
+    calls = []
+
+    def strong_kw():
+        calls.append(None)
+        return {'strength': rv.uniform(0.2, 0.4)}
+
+    g, _ = compact_community_graph(3, 3, 0, 8, 0, strong_kw=strong_kw, random=random.Random(2))
+    strong = [edge.attr('strength') for edge in g.iter_edges() if edge.attr('kind') == 'strong']
+    assert len(calls) == 1
+    assert len(strong) == 8 and len(set(strong)) == 8
+    assert all(0.2 <= strength <= 0.4 for strength in strong)
+
+
+def test__should_enumerate_free_pairs_near_saturation():
+    g, _ = compact_community_graph(1, 2, 198, 19899, 0, random=random.Random(4))
+    assert g.num_edges_by_kind == {'core': 1, 'strong': 19899}
+
+    weights = np.ones(6)
+    weights[0] = 0
+    g, _ = compact_community_graph(2, 3, 0, 6, 0, degree_weights=weights, random=random.Random(4))
+    assert g.num_edges_by_kind == {'core': 6, 'strong': 6}
+    assert g.degree(0) == 2
+    with pytest.raises(ValueError):
+        compact_community_graph(2, 3, 0, 7, 0, degree_weights=weights)
+
+
+def test__should_sample_compact_edges_from_blocks_and_weights():
+    g, _ = compact_community_graph(3, 3, 20, 30, 0, block_matrix=np.diag([1.0, 1.0, 1.0, 1.0]),
+                                   random=random.Random(1))
+    assert all(edge.from_node >= 9 and edge.to_node >= 9
+               for edge in g.iter_edges() if edge.attr('kind') == 'strong')
+
+    weights = np.ones(29)
+    weights[:9] = 0
+    g, _ = compact_community_graph(3, 3, 20, 30, 30, degree_weights=weights, random=random.Random(1))
+    assert all(g.degree(node) == 2 for node in range(9))
+
+    with pytest.raises(ValueError):
+        compact_community_graph(2, 2, 0, 10, 0)
 
 
 class TestNodeCommunityMap(unittest.TestCase):
@@ -64,3 +179,34 @@ class TestNodeCommunityMap(unittest.TestCase):
 
 
 
+
+
+def test__should_extend_cached_community_layout_with_new_nodes():
+    graph = Graph(directed=False)
+    graph.add_edge((0, 1))
+    graph.add_edge((2, 3))
+    community_map = {0: 0, 1: 0, 2: 1, 3: 1}
+    positions = CommunityNodePositions(community_map)
+    layout = layout_for(graph, 0, positions)
+
+    graph.add_edge((3, 4))
+    extended = layout_for(graph, 0, positions)
+    assert extended.xy([0, 1, 2, 3]).tolist() == layout.coords.tolist()
+    assert dict(extended.items()) == dict(CommunityNodePositions(community_map)(graph, 0))
+
+
+def test__should_place_nodes_around_their_squares():
+    graph = Graph.of_size(60, directed=False)
+    community_map = {node: node // 10 for node in range(50)}
+    positions = CommunityNodePositions(community_map)
+    layout = positions.layout(graph, 0)
+    selected_sq, not_selected = layout.state['squares']
+
+    centers = positions.r * (2 * selected_sq[[community_map[node] for node in range(50)]] + 1)
+    offsets = layout.xy(range(50)) - centers
+    assert (np.hypot(*offsets.T) <= positions.r * positions.rfactor).all()
+
+    orphan_offsets = layout.xy(range(50, 60))[:, None, :] - positions.r * (2 * not_selected + 1)
+    assert (np.hypot(orphan_offsets[..., 0], orphan_offsets[..., 1]).min(axis=1)
+            <= positions.r * positions.rfactor).all()
+    assert layout.coords.tolist() == CommunityNodePositions(community_map).layout(graph, 0).coords.tolist()
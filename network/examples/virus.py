@@ -1,17 +1,41 @@
 from network.simulation import test, Simulation
-from network.transmission import GraphTransmission, DelayedSelector
+from network.transmission import GraphTransmission, BernoulliTransmission, EventTransmission, DelayedSelector
 
 
 def virus_simulation(graph, patient0, incubation_period, contagious_for,
-                     runner, test_transmit=None):
+                     runner, test_transmit=None, vectorized=False, random=None, record='path',
+                     event_driven=False):
+    if event_driven:
+        if vectorized:
+            raise ValueError('Simulations can be either event-driven or vectorized, not both')
+        transmission = EventTransmission(
+            graph, patient0,
+            lag=incubation_period,
+            test_transmit=test_transmit,
+            persist_broadcast=contagious_for,
+            random=random
+        )
+        return Simulation(transmission, runner=runner, record=record)
+
+    if vectorized:
+        if test_transmit:
+            raise ValueError('Vectorized simulations test transmission by edge strength only')
+        transmission = BernoulliTransmission(
+            graph, patient0,
+            selector=DelayedSelector(incubation_period, random=random),
+            persist_broadcast=contagious_for,
+            random=random
+        )
+        return Simulation(transmission, runner=runner, record=record)
+
     if not test_transmit:
-        test_transmit = lambda trans, edge: test(edge.attr('strength'))
+        test_transmit = lambda trans, edge: test(edge.attr('strength'), trans.random)
 
     transmission = GraphTransmission(
         graph, patient0,
-        selector=DelayedSelector(incubation_period),
+        selector=DelayedSelector(incubation_period, random=random),
         test_transmit=test_transmit,
-        persist_broadcast=contagious_for
+        persist_broadcast=contagious_for,
+        random=random
     )
-    return Simulation(transmission, runner=runner)
-
+    return Simulation(transmission, runner=runner, record=record)
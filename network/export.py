@@ -0,0 +1,139 @@
+import functools
+import io
+import math
+import os
+import shutil
+import subprocess
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from pathos.multiprocessing import ProcessingPool
+
+from network.simulation.sim import _shutdown_pool
+
+NEVER = np.iinfo(np.int64).max
+
+
+def frame_schedule(simulation, plotter, every=1, steps=None):
+    path = list(simulation.path(steps))
+    n_frames = 1 + math.ceil(len(path) / every)
+    index = plotter.layout.index
+
+    node_frames = np.full(len(index), NEVER, dtype=np.int64)
+    edge_frames = np.full(len(plotter.edge_colors), NEVER, dtype=np.int64)
+    node_frames[index[simulation.originating_node]] = 0
+
+    edges = [edge for segment in path for edge in segment]
+    if edges:
+        frames = np.repeat(np.arange(len(path)) // every + 1, [len(segment) for segment in path])
+        np.minimum.at(edge_frames, plotter.edge_rows(edges), frames)
+        np.minimum.at(node_frames, index.ids_of(edge.from_node for edge in edges), frames)
+        np.minimum.at(node_frames, index.ids_of(edge.to_node for edge in edges), frames)
+    return node_frames, edge_frames, n_frames
+
+
+def export_frames(simulation, drawer, directory, every=3, steps=None, workers=None,
+                  marked_color='red', arrows=True, figsize=None, dpi=100,
+                  name='frame-{:05d}.png', **draw_kw):
+    args, n_frames = _frame_args(simulation, drawer, every, steps)
+    os.makedirs(directory, exist_ok=True)
+    workers = _default_workers(workers)
+    ranges = _frame_ranges(n_frames, workers)
+    options = dict(marked_color=marked_color, arrows=arrows, figsize=figsize, dpi=dpi,
+                   draw_kw=draw_kw)
+    save = functools.partial(_save_frame, directory, name)
+
+    if workers <= 1:
+        paths = [_render_frames(*args, frames, options, save) for frames in ranges]
+    else:
+        paths = _render_in_pool(workers, args, ranges, options, save)
+    return [path for chunk in paths for path in chunk]
+
+
+def export_video(simulation, drawer, path, fps=10, ffmpeg='ffmpeg', ffmpeg_args=(), every=3, steps=None,
+                 workers=None, marked_color='red', arrows=True, figsize=None, dpi=100, **draw_kw):
+    executable = shutil.which(ffmpeg)
+    if executable is None:
+        raise RuntimeError(f'{ffmpeg} was not found; export PNG frames with export_frames instead')
+
+    args, n_frames = _frame_args(simulation, drawer, every, steps)
+    options = dict(marked_color=marked_color, arrows=arrows, figsize=figsize, dpi=dpi,
+                   draw_kw=draw_kw)
+    command = [executable, '-y', '-loglevel', 'error', '-f', 'image2pipe', '-framerate', str(fps),
+               '-i', '-', *ffmpeg_args, str(path)]
+    workers = _default_workers(workers)
+    with subprocess.Popen(command, stdin=subprocess.PIPE) as proc:
+        if workers <= 1:
+            _render_frames(*args, (0, n_frames), options, functools.partial(_stream_frame, proc.stdin))
+        else:
+            ranges = _frame_ranges(n_frames, workers * 4)
+            for chunk in _render_in_pool(workers, args, ranges, options, _png_frame):
+                for frame in chunk:
+                    proc.stdin.write(frame)
+        proc.stdin.close()
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, command)
+    return path
+
+
+def _frame_args(simulation, drawer, every, steps):
+    start = simulation.originating_node
+    plotter = drawer._generate_plotter(start)
+    node_frames, edge_frames, n_frames = frame_schedule(simulation, plotter, every, steps)
+    return (drawer, start, plotter.layout, node_frames, edge_frames), n_frames
+
+
+def _default_workers(workers):
+    return min(os.cpu_count() or 1, 4) if workers is None else workers
+
+
+def _frame_ranges(n_frames, n_ranges):
+    return [(int(frames[0]), int(frames[-1]) + 1)
+            for frames in np.array_split(np.arange(n_frames), min(n_ranges, n_frames))]
+
+
+def _render_in_pool(workers, args, ranges, options, save):
+    n_ranges = len(ranges)
+    pool = ProcessingPool(workers)
+    try:
+        yield from pool.imap(_render_frames, *([arg] * n_ranges for arg in args), ranges,
+                             [options] * n_ranges, [save] * n_ranges)
+    finally:
+        _shutdown_pool(pool)
+
+
+def _save_frame(directory, name, fig, frame, dpi):
+    path = os.path.join(directory, name.format(frame))
+    fig.savefig(path, dpi=dpi)
+    return path
+
+
+def _stream_frame(stream, fig, frame, dpi):
+    fig.savefig(stream, format='png', dpi=dpi)
+
+
+def _png_frame(fig, frame, dpi):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi)
+    return buffer.getvalue()
+
+
+def _render_frames(drawer, start, layout, node_frames, edge_frames, frames, options, save):
+    first, stop = frames
+    fig = Figure(figsize=options['figsize'], dpi=options['dpi'])
+    FigureCanvasAgg(fig)
+    plotter = drawer._generate_plotter(start, layout)
+    plotter.mark_frames(node_frames, edge_frames, first + 1, options['marked_color'],
+                        edges=options['arrows'])
+    drawer.draw(start, plotter_inst=plotter, arrows=options['arrows'], ax=fig.add_subplot(),
+                **options['draw_kw'])
+
+    saved = []
+    for frame in range(first, stop):
+        if frame > first:
+            plotter.mark_frames(node_frames, edge_frames, frame + 1, options['marked_color'],
+                                start=frame, edges=options['arrows'])
+            plotter.refresh()
+        saved.append(save(fig, frame, options['dpi']))
+    return saved
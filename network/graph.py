@@ -1,22 +1,86 @@
-import attr
+from collections import Counter
+from functools import total_ordering
+from types import MappingProxyType
 from typing import Any
 
+import attr
 
-@attr.s(frozen=True, slots=True)
-class _Edge:
+from network.nodeindex import NodeIndex
+
+
+@total_ordering
+class _EdgeBase:
+    __slots__ = ()
+
+    @property
+    def attrs(self):
+        if isinstance(self._attrs, dict):
+            return MappingProxyType(self._attrs)
+        return self._attrs
+
+    def attr(self, item):
+        return self._attrs.get(item, None)
+
+    def snapshot(self):
+        return _Edge(self.from_node, self.to_node, dict(self._attrs))
+
+    def __eq__(self, other):
+        if not isinstance(other, _EdgeBase):
+            return NotImplemented
+        return self.nodes == other.nodes
+
+    def __lt__(self, other):
+        if not isinstance(other, _EdgeBase):
+            return NotImplemented
+        return self.nodes < other.nodes
+
+    def __hash__(self):
+        return hash(self.nodes)
+
+
+@attr.s(frozen=True, slots=True, eq=False)
+class _Edge(_EdgeBase):
     from_node: Any = attr.ib()
     to_node: Any = attr.ib()
-    attrs: dict = attr.ib(factory=dict, eq=False, repr=False, order=False)
+    _attrs: dict = attr.ib(factory=dict, repr=False)
     nodes: tuple = attr.ib(
-        init=False, eq=False, repr=False, order=False,
+        init=False, repr=False,
         default=attr.Factory(
             lambda self: (self.from_node, self.to_node),
             takes_self=True
         )
     )
 
-    def attr(self, item):
-        return self.attrs.get(item, None)
+
+class _EdgeCursor(_EdgeBase):
+    __slots__ = ('from_node', 'to_node', '_attrs')
+
+    def __init__(self):
+        self.from_node = None
+        self.to_node = None
+        self._attrs = None
+
+    @property
+    def nodes(self):
+        return self.from_node, self.to_node
+
+    def _move_to(self, from_node, to_node, attrs):
+        self.from_node = from_node
+        self.to_node = to_node
+        self._attrs = attrs
+        return self
+
+    def detach(self):
+        return _Edge(self.from_node, self.to_node, self._attrs)
+
+    def __repr__(self):
+        return f'_EdgeCursor(from_node={self.from_node!r}, to_node={self.to_node!r})'
+
+
+@attr.s(frozen=True, slots=True)
+class Levels:
+    levels: list = attr.ib()
+    child_counts: dict = attr.ib()
 
 
 class Graph:
@@ -35,39 +99,94 @@ class Graph:
     def __init__(self, vertices=None, directed=True):
         if vertices is None:
             vertices = []
-        self._A = {vertex: {} for vertex in vertices}
+        self._A = {}
         self._directed = directed
+        self._kinds = {}
+        self._num_edges = 0
+        self._in_degrees = {}
+        self._kind_out_degrees = {}
+        self._kind_in_degrees = {}
+        self._degree_counts = [0]
+        self._node_index = NodeIndex()
+        self._version = 0
+        for vertex in vertices:
+            if vertex not in self._A:
+                self._add_node(vertex)
 
     @property
     def nodes(self):
         return self._A.keys()
 
+    @property
+    def node_index(self):
+        return self._node_index
+
+    @property
+    def version(self):
+        return self._version
+
+    def node_id(self, node):
+        return self._node_index[node]
+
     @property
     def num_edges(self):
-        num = sum(len(edges) for edges in self._A.values())
-        return num if self._directed else num / 2
+        return self._num_edges
+
+    @property
+    def num_edges_by_kind(self):
+        return {kind: len(kind_edges) for kind, kind_edges in self._kinds.items() if kind_edges}
+
+    def out_degree(self, node, kind=None):
+        if not self.contains_node(node):
+            raise ValueError(f'Node {node} does not exist in this graph')
+        if kind is None:
+            return len(self._A[node])
+        return self._kind_out_degrees.get(kind, {}).get(node, 0)
+
+    def in_degree(self, node, kind=None):
+        if not self._directed:
+            return self.out_degree(node, kind)
+        if not self.contains_node(node):
+            raise ValueError(f'Node {node} does not exist in this graph')
+        if kind is None:
+            return self._in_degrees[node]
+        return self._kind_in_degrees.get(kind, {}).get(node, 0)
+
+    def degree(self, node, kind=None):
+        if not self._directed:
+            return self.out_degree(node, kind)
+        return self.out_degree(node, kind) + self.in_degree(node, kind)
+
+    def degree_distribution(self):
+        return Counter({degree: count for degree, count in enumerate(self._degree_counts) if count})
 
     @property
     def directed(self):
         return self._directed
 
-    def iter_edges(self):
+    def iter_edges(self, borrowed=False):
+        cursor = _EdgeCursor() if borrowed else None
         traversed_edges = set()
-        for from_node in self._A:
-            for to_node in self._A[from_node]:
+        for from_node, adjacent in self._A.items():
+            for to_node, attrs in adjacent.items():
                 if self._directed:
-                    yield self._get_edge((from_node, to_node))
+                    yield self._edge_of(from_node, to_node, attrs, cursor)
                 elif (to_node, from_node) not in traversed_edges:
                     traversed_edges.add((from_node, to_node))
-                    yield self._get_edge((from_node, to_node))
+                    yield self._edge_of(from_node, to_node, attrs, cursor)
 
     def contains_node(self, node):
         return node in self._A
 
     def _get_edge(self, edge):
         from_node, to_node = Graph._nodes_of(edge)
-        attrs = self._A[from_node][to_node]
-        return _Edge(from_node, to_node, dict(attrs))
+        return self._edge_of(from_node, to_node, self._A[from_node][to_node])
+
+    @staticmethod
+    def _edge_of(from_node, to_node, attrs, cursor=None):
+        if cursor is not None:
+            return cursor._move_to(from_node, to_node, attrs)
+        return _Edge(from_node, to_node, attrs)
 
     def contains_edge(self, edge):
         from_node, to_node = Graph._nodes_of(edge)
@@ -75,59 +194,237 @@ class Graph:
 
     @staticmethod
     def _nodes_of(edge):
-        if isinstance(edge, _Edge):
+        if isinstance(edge, _EdgeBase):
             return edge.nodes
         return edge
 
     def add_node(self, node):
         if self.contains_node(node):
             raise ValueError(f'Graph already contains node {node}')
+        self._add_node(node)
+
+    def _add_node(self, node):
+        self._node_index.intern(node)
+        self._version += 1
         self._A[node] = {}
+        self._in_degrees[node] = 0
+        self._degree_counts[0] += 1
 
     def add_edge(self, edge, **attrs):
         if self.contains_edge(edge):
             raise ValueError(f'Edge {edge} already exists')
+        self._link(edge, attrs)
+
+    def add_edges(self, edges, **attrs):
+        for edge in edges:
+            if self.contains_edge(edge):
+                raise ValueError(f'Edge {edge} already exists')
+            self._link(edge, {key: value() if callable(value) else value
+                              for key, value in attrs.items()})
+
+    def _link(self, edge, attrs):
         from_node, to_node = edge
 
-        if not self.contains_node(from_node):
-            self._A[from_node] = {}
-        if not self.contains_node(to_node):
-            self._A[to_node] = {}
+        if from_node not in self._A:
+            self._add_node(from_node)
+        if to_node not in self._A:
+            self._add_node(to_node)
+        from_adjacent, to_adjacent = self._A[from_node], self._A[to_node]
+        kind = attrs.get('kind')
+        kind_out = self._kind_out_degrees.get(kind)
+        if kind_out is None:
+            kind_out = self._kind_out_degrees[kind] = {}
 
-        self._A[from_node][to_node] = attrs
-        if not self._directed:
-            self._A[to_node][from_node] = attrs
+        if self._directed:
+            in_degrees = self._in_degrees
+            from_degree = len(from_adjacent) + in_degrees[from_node]
+            to_degree = len(to_adjacent) + in_degrees[to_node]
+            in_degrees[to_node] += 1
+            kind_in = self._kind_in_degrees.get(kind)
+            if kind_in is None:
+                kind_in = self._kind_in_degrees[kind] = {}
+            kind_in[to_node] = kind_in.get(to_node, 0) + 1
+        else:
+            from_degree, to_degree = len(from_adjacent), len(to_adjacent)
+            to_adjacent[from_node] = attrs
+            if to_node != from_node:
+                kind_out[to_node] = kind_out.get(to_node, 0) + 1
+        from_adjacent[to_node] = attrs
+        kind_out[from_node] = kind_out.get(from_node, 0) + 1
+
+        kind_edges = self._kinds.get(kind)
+        if kind_edges is None:
+            kind_edges = self._kinds[kind] = {}
+        kind_edges[(from_node, to_node)] = attrs
+        self._num_edges += 1
+        self._version += 1
+
+        counts = self._degree_counts
+        if from_node == to_node:
+            self._shift_degree(from_degree, 2 if self._directed else 1)
+        else:
+            if max(from_degree, to_degree) + 1 == len(counts):
+                counts.append(0)
+            counts[from_degree] -= 1
+            counts[from_degree + 1] += 1
+            counts[to_degree] -= 1
+            counts[to_degree + 1] += 1
+
+    def _unlink(self, from_node, to_node):
+        from_adjacent, to_adjacent = self._A[from_node], self._A[to_node]
+        if self._directed:
+            in_degrees = self._in_degrees
+            from_degree = len(from_adjacent) + in_degrees[from_node]
+            to_degree = len(to_adjacent) + in_degrees[to_node]
+            in_degrees[to_node] -= 1
+            attrs = from_adjacent.pop(to_node)
+        else:
+            from_degree, to_degree = len(from_adjacent), len(to_adjacent)
+            attrs = from_adjacent.pop(to_node)
+            to_adjacent.pop(from_node, None)
+
+        kind = attrs.get('kind')
+        kind_edges = self._kinds[kind]
+        if kind_edges.pop((from_node, to_node), None) is None:
+            del kind_edges[(to_node, from_node)]
+        kind_out = self._kind_out_degrees[kind]
+        kind_out[from_node] -= 1
+        if self._directed:
+            self._kind_in_degrees[kind][to_node] -= 1
+        elif to_node != from_node:
+            kind_out[to_node] -= 1
+        self._num_edges -= 1
+        self._version += 1
+
+        counts = self._degree_counts
+        if from_node == to_node:
+            self._shift_degree(from_degree, -2 if self._directed else -1)
+        else:
+            counts[from_degree] -= 1
+            counts[from_degree - 1] += 1
+            counts[to_degree] -= 1
+            counts[to_degree - 1] += 1
+        return attrs
+
+    def _shift_degree(self, previous_degree, change):
+        counts = self._degree_counts
+        counts.extend([0] * (previous_degree + change + 1 - len(counts)))
+        counts[previous_degree] -= 1
+        counts[previous_degree + change] += 1
+
+    def _count_kind(self, from_node, to_node, kind, delta):
+        out_degrees = self._kind_out_degrees.get(kind)
+        if out_degrees is None:
+            out_degrees = self._kind_out_degrees[kind] = {}
+        out_degrees[from_node] = out_degrees.get(from_node, 0) + delta
+        if self._directed:
+            in_degrees = self._kind_in_degrees.get(kind)
+            if in_degrees is None:
+                in_degrees = self._kind_in_degrees[kind] = {}
+            in_degrees[to_node] = in_degrees.get(to_node, 0) + delta
+        elif to_node != from_node:
+            out_degrees[to_node] = out_degrees.get(to_node, 0) + delta
+
+    def _unindex(self, from_node, to_node, attrs):
+        kind_edges = self._kinds[attrs.get('kind')]
+        if (from_node, to_node) in kind_edges:
+            del kind_edges[(from_node, to_node)]
+            return from_node, to_node
+        del kind_edges[(to_node, from_node)]
+        return to_node, from_node
 
     def remove_edge(self, edge):
         if self.contains_edge(edge):
             from_node, to_node = Graph._nodes_of(edge)
-            edge = self._A[from_node][to_node]
-            del self._A[from_node][to_node]
+            edge = self._unlink(from_node, to_node)
 
             if not self._directed:
-                edge2 = self._A[to_node][from_node]
-                del self._A[to_node][from_node]
-                return edge, edge2
+                return edge, edge
             else:
                 return edge
         return None
 
+    def _edge_items(self, kind=None):
+        if kind is not None:
+            return list(self._kinds.get(kind, {}).items())
+        return [item for kind_edges in self._kinds.values() for item in kind_edges.items()]
+
+    def edges_of_kind(self, kind):
+        for (from_node, to_node), attrs in self._edge_items(kind):
+            yield _Edge(from_node, to_node, attrs)
+
+    def remove_edges(self, of_kind=None, where=None):
+        removed = []
+        for (from_node, to_node), attrs in self._edge_items(of_kind):
+            edge = _Edge(from_node, to_node, attrs)
+            if where is None or where(edge):
+                self._unlink(from_node, to_node)
+                removed.append(edge)
+        return removed
+
     def update_edge(self, edge, **attrs):
         if not self.contains_edge(edge):
             raise ValueError(f'Edge {edge} does not exist')
         from_node, to_node = Graph._nodes_of(edge)
-        self._A[from_node][to_node].update(attrs)
+        self._update_attrs(from_node, to_node, self._A[from_node][to_node], attrs)
         if not self._directed:
             self._A[to_node][from_node].update(attrs)
 
+    def update_edges(self, of_kind=None, where=None, **attrs):
+        for (from_node, to_node), edge_attrs in self._edge_items(of_kind):
+            if where is None or where(_Edge(from_node, to_node, edge_attrs)):
+                self._update_attrs(from_node, to_node, edge_attrs, {
+                    key: value() if callable(value) else value for key, value in attrs.items()
+                })
+
+    def _update_attrs(self, from_node, to_node, edge_attrs, attrs):
+        if 'kind' in attrs and attrs['kind'] != edge_attrs.get('kind'):
+            key = self._unindex(from_node, to_node, edge_attrs)
+            self._count_kind(*key, edge_attrs.get('kind'), -1)
+            edge_attrs.update(attrs)
+            self._kinds.setdefault(edge_attrs.get('kind'), {})[key] = edge_attrs
+            self._count_kind(*key, edge_attrs.get('kind'), 1)
+        else:
+            edge_attrs.update(attrs)
+
     def get_edge_attrs(self, edge):
         if not self.contains_edge(edge):
             raise ValueError(f'Edge {edge} does not exist')
         return dict(self._get_edge(edge).attrs)
 
     def _children_for(self, node_index, predicate=None):
-        return (node for node in self._A[node_index]
-                if predicate is None or predicate(node))
+        if predicate is None:
+            return self._A[node_index]
+        return (node for node in self._A[node_index] if predicate(node))
+
+    def levels(self, start, deg=None, predicate=None):
+        if not self.contains_node(start):
+            raise ValueError(f'Node {start} does not exist in this graph')
+        if deg is not None and deg < 1:
+            raise ValueError('Deg must be >= 1')
+
+        level_of = {start: 0}
+        levels = [[start]]
+        child_counts = {}
+
+        frontier = levels[0]
+        while frontier and (deg is None or len(levels) <= deg):
+            this_level = len(levels) - 1
+            next_level = []
+            for parent in frontier:
+                n_children = 0
+                for child in self._children_for(parent, predicate):
+                    child_level = level_of.get(child, -1)
+                    if child_level < 0:
+                        level_of[child] = this_level + 1
+                        next_level.append(child)
+                    if child_level != this_level:
+                        n_children += 1
+                child_counts[parent] = n_children
+            levels.append(next_level)
+            frontier = next_level
+
+        return Levels(levels, child_counts)
 
     def children(self, node_index, deg=1, predicate=None, exclude_dups=True):
         if not self.contains_node(node_index):
@@ -135,25 +432,36 @@ class Graph:
         if deg is not None and deg < 1:
             raise ValueError('Deg must be >= 1')
 
-        deg_on = 1
-        tracked_deg_nodes = list(self._children_for(node_index, predicate))
-        traversed_nodes = set(tracked_deg_nodes)
-        traversed_nodes.add(node_index)
-        yield tracked_deg_nodes
+        if exclude_dups and deg == 1:
+            levels = [[child for child in self._children_for(node_index, predicate) if child != node_index]]
+        elif exclude_dups:
+            levels = self.levels(node_index, deg, predicate).levels[1:]
+        else:
+            levels = self._levels_with_dups(node_index, deg, predicate)
 
+        deg_on = 0
+        for level in levels:
+            deg_on += 1
+            yield level
         while deg is None or deg_on < deg:
             deg_on += 1
-            this_deg_nodes = []
-            for parent in tracked_deg_nodes:
-                is_dup = lambda node: exclude_dups and node in traversed_nodes
-                this_deg_nodes += [node for node in self._children_for(parent, predicate)
-                                   if not is_dup(node)]
-                traversed_nodes.update(this_deg_nodes)
-            tracked_deg_nodes = this_deg_nodes
-            yield tracked_deg_nodes
-
-    def outbound_edges(self, from_node):
+            yield []
+
+    def _levels_with_dups(self, start, deg, predicate):
+        level = list(self._children_for(start, predicate))
+        deg_on = 1
+        yield level
+        while level and (deg is None or deg_on < deg):
+            deg_on += 1
+            next_level = []
+            for parent in level:
+                next_level.extend(self._children_for(parent, predicate))
+            level = next_level
+            yield level
+
+    def outbound_edges(self, from_node, borrowed=False):
         if not self.contains_node(from_node):
             raise ValueError(f'Node {from_node} does not exist in this graph')
-        for child in self._children_for(from_node):
-            yield self._get_edge((from_node, child))
+        cursor = _EdgeCursor() if borrowed else None
+        for child, attrs in self._A[from_node].items():
+            yield self._edge_of(from_node, child, attrs, cursor)
@@ -0,0 +1,174 @@
+import os
+from collections.abc import Sequence
+
+import attr
+import numpy as np
+
+CORE_COLUMNS = ('steps', 'broadcasts', 'tests')
+
+
+@attr.s(frozen=True, slots=True)
+class TransmissionState:
+    steps: int = attr.ib()
+    broadcasts: int = attr.ib()
+    tests: int = attr.ib()
+
+    def to_dict(self):
+        return {
+            'steps': self.steps,
+            'broadcasts': self.broadcasts,
+            'tests': self.tests,
+        }
+
+
+class TransmissionHistory(Sequence):
+    def __init__(self, maxlen=None, capacity=16):
+        if maxlen is not None and maxlen < 1:
+            raise ValueError('maxlen must be at least 1')
+        self._maxlen = maxlen
+        self._columns = {name: np.zeros(capacity, dtype=np.int64) for name in CORE_COLUMNS}
+        self._start = 0
+        self._stop = 0
+
+    @property
+    def maxlen(self):
+        return self._maxlen
+
+    @property
+    def names(self):
+        return tuple(self._columns)
+
+    def register(self, name, fill=0):
+        if name in self._columns:
+            raise ValueError(f'Column {name} is already recorded')
+        self._columns[name] = np.full(self._capacity, fill, dtype=np.int64)
+
+    @property
+    def _capacity(self):
+        return len(self._columns['steps'])
+
+    def _make_room(self):
+        size = self._stop - self._start
+        capacity = self._capacity if 2 * size <= self._capacity else 2 * self._capacity
+        for name, values in self._columns.items():
+            moved = np.zeros(capacity, dtype=values.dtype)
+            moved[:size] = values[self._start:self._stop]
+            self._columns[name] = moved
+        self._start, self._stop = 0, size
+
+    def append(self, **values):
+        if self._stop == self._capacity:
+            self._make_room()
+        for name, column in self._columns.items():
+            column[self._stop] = values.get(name, 0)
+        self._stop += 1
+        if self._maxlen is not None and self._stop - self._start > self._maxlen:
+            self._start += 1
+
+    def resize(self, maxlen):
+        resized = TransmissionHistory(maxlen, max(self._capacity, 16))
+        for name in self._columns:
+            if name not in resized._columns:
+                resized.register(name)
+        for i in range(len(self)):
+            resized.append(**self.row(i))
+        return resized
+
+    def view(self):
+        view = _HistoryView.__new__(_HistoryView)
+        view._maxlen = self._maxlen
+        view._columns = dict(self._columns)
+        view._start, view._stop = self._start, self._stop
+        return view
+
+    def column(self, name):
+        values = self._columns[name][self._start:self._stop]
+        values.flags.writeable = False
+        return values
+
+    def to_dict(self):
+        return {name: self.column(name) for name in self._columns}
+
+    def row(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('history index out of range')
+        return {name: int(values[self._start + index]) for name, values in self._columns.items()}
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self[i] for i in range(len(self))[index])
+        row = self.row(index)
+        return TransmissionState(steps=row['steps'], broadcasts=row['broadcasts'], tests=row['tests'])
+
+    def __eq__(self, other):
+        if not isinstance(other, TransmissionHistory):
+            return NotImplemented
+        return self.names == other.names and all(
+            np.array_equal(self.column(name), other.column(name)) for name in self.names
+        )
+
+    def __getstate__(self):
+        return {'maxlen': self._maxlen, 'columns': {name: self.column(name).copy() for name in self._columns}}
+
+    def __setstate__(self, state):
+        self._maxlen = state['maxlen']
+        self._columns = state['columns']
+        self._start = 0
+        self._stop = len(self._columns['steps'])
+
+    def __repr__(self):
+        return f'TransmissionHistory({len(self)} steps, columns={list(self._columns)})'
+
+
+class _HistoryView(TransmissionHistory):
+    def register(self, name, fill=0):
+        raise TypeError('history views are read-only')
+
+    def append(self, **values):
+        raise TypeError('history views are read-only')
+
+
+def stack_histories(histories, steps=None):
+    histories = list(histories)
+    if steps is None:
+        steps = max((len(history) for history in histories), default=0)
+    names = histories[0].names if histories else CORE_COLUMNS
+
+    stacked = {}
+    for name in names:
+        stacked[name] = np.zeros((len(histories), steps), dtype=np.int64)
+        for run, history in enumerate(histories):
+            values = history.column(name)[:steps]
+            stacked[name][run, :len(values)] = values
+            if len(values) and len(values) < steps:
+                stacked[name][run, len(values):] = values[-1]
+    return stacked
+
+
+def save_histories(path, histories, steps=None):
+    stacked = stack_histories(histories, steps)
+    ext = os.path.splitext(str(path))[1]
+    if ext == '.npz':
+        np.savez(path, **stacked)
+    elif ext == '.parquet':
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError('Saving .parquet histories requires pyarrow; install it or use .npz') from e
+
+        runs, steps = next(iter(stacked.values())).shape
+        table = pa.table({
+            'run': np.repeat(np.arange(runs), steps),
+            'step': np.tile(np.arange(steps), runs),
+            **{name: values.ravel() for name, values in stacked.items()}
+        })
+        pq.write_table(table, path)
+    else:
+        raise ValueError(f'Unsupported history format {ext!r}; use .npz or .parquet')
+    return stacked
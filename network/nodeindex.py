@@ -0,0 +1,85 @@
+from types import MappingProxyType
+
+import numpy as np
+
+
+class NodeIndex:
+    def __init__(self, nodes=(), frozen=False):
+        self._nodes = []
+        self._ids = {}
+        self._frozen = False
+        nodes = list(nodes)
+        ids = dict(zip(nodes, range(len(nodes))))
+        if len(ids) == len(nodes):
+            self._nodes, self._ids = nodes, ids
+        else:
+            for node in nodes:
+                self.intern(node)
+        self._frozen = frozen
+
+    @property
+    def frozen(self):
+        return self._frozen
+
+    def freeze(self):
+        if self._frozen:
+            return self
+        frozen = NodeIndex()
+        frozen._nodes = list(self._nodes)
+        frozen._ids = dict(self._ids)
+        frozen._frozen = True
+        return frozen
+
+    @property
+    def nodes(self):
+        return tuple(self._nodes)
+
+    @property
+    def ids(self):
+        return MappingProxyType(self._ids)
+
+    def intern(self, node):
+        node_id = self._ids.get(node)
+        if node_id is None:
+            if self._frozen:
+                raise KeyError(f'Node {node} is not in this frozen index')
+            node_id = len(self._nodes)
+            self._ids[node] = node_id
+            self._nodes.append(node)
+        return node_id
+
+    def intern_many(self, nodes):
+        return np.fromiter((self.intern(node) for node in nodes), dtype=np.int64)
+
+    def get(self, node, default=None):
+        return self._ids.get(node, default)
+
+    def ids_of(self, nodes):
+        return np.fromiter(map(self._ids.__getitem__, nodes), dtype=np.int64)
+
+    def node_of(self, node_id):
+        return self._nodes[node_id]
+
+    def nodes_of(self, ids):
+        nodes = self._nodes
+        return [nodes[node_id] for node_id in np.asarray(ids, dtype=np.int64).tolist()]
+
+    def __getitem__(self, node):
+        return self._ids[node]
+
+    def __contains__(self, node):
+        return node in self._ids
+
+    def __iter__(self):
+        return iter(self._nodes)
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __eq__(self, other):
+        if not isinstance(other, NodeIndex):
+            return NotImplemented
+        return self._nodes == other._nodes
+
+    def __repr__(self):
+        return f'NodeIndex({len(self)} nodes, frozen={self._frozen})'
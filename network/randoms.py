@@ -1,21 +1,34 @@
 import pickle
 import random
 from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
 
+import numpy as np
 
+
+@lru_cache(maxsize=None)
 def get_fixed_state():
     pkl_dir = Path(__file__).resolve().parent
     with open(f'{pkl_dir}/resources/sim_state.pkl', 'rb') as f:
         return pickle.load(f)
 
 
+def load_fixed_state():
+    get_fixed_state()
+
+
 def fixed_random():
     rand = random.Random()
     rand.setstate(get_fixed_state())
     return rand
 
 
+def fork_randoms(n, rand=None):
+    rand = rand or fixed_random()
+    return [random.Random(rand.getrandbits(128)) for _ in range(n)]
+
+
 @contextmanager
 def fix_random(rand=None, state=None):
     random_ = rand or random
@@ -25,4 +38,13 @@ def fix_random(rand=None, state=None):
         random_.setstate(fixed_state)
         yield
     finally:
-        random_.setstate(saved_state)
\ No newline at end of file
+        random_.setstate(saved_state)
+
+
+def spawn_seeds(seed, n):
+    children = np.random.SeedSequence(seed).spawn(n)
+    return [int.from_bytes(child.generate_state(4).tobytes(), 'little') for child in children]
+
+
+def spawn_randoms(seed, n):
+    return [random.Random(child_seed) for child_seed in spawn_seeds(seed, n)]
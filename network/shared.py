@@ -0,0 +1,93 @@
+import os
+import pickle
+import shutil
+import tempfile
+import uuid
+
+import attr
+import numpy as np
+
+from network.compact import CompactGraph, _Column
+
+_attached = {}
+_attached_dirs = {}
+
+
+@attr.s(frozen=True, slots=True)
+class SharedGraphHandle:
+    token: str = attr.ib()
+    directory: str = attr.ib()
+    directed: bool = attr.ib()
+    columns: tuple = attr.ib()
+
+    def _load(self, name):
+        return np.load(os.path.join(self.directory, f'{name}.npy'), mmap_mode='r')
+
+    def attach(self):
+        if self.token not in _attached:
+            for token, graph_dir in list(_attached_dirs.items()):
+                if not os.path.isdir(graph_dir):
+                    del _attached[token], _attached_dirs[token]
+
+            with open(os.path.join(self.directory, 'nodes.pkl'), 'rb') as f:
+                nodes = pickle.load(f)
+            columns = {
+                name: _Column(self._load(f'column-{i}'),
+                              self._load(f'present-{i}') if has_present else None,
+                              categories)
+                for i, (name, has_present, categories) in enumerate(self.columns)
+            }
+            _attached_dirs[self.token] = self.directory
+            _attached[self.token] = CompactGraph(
+                nodes, self._load('offsets'), self._load('targets'), self._load('edge_ids'),
+                self.directed, columns
+            )
+        return _attached[self.token]
+
+
+class SharedGraph:
+    def __init__(self, graph, directory=None):
+        if not isinstance(graph, CompactGraph):
+            graph = CompactGraph.from_graph(graph)
+        if directory is None and os.path.isdir('/dev/shm'):
+            directory = '/dev/shm'
+        self._directory = tempfile.mkdtemp(prefix='network-graph-', dir=directory)
+
+        with open(os.path.join(self._directory, 'nodes.pkl'), 'wb') as f:
+            pickle.dump(list(graph.nodes), f, protocol=pickle.HIGHEST_PROTOCOL)
+        self._save('offsets', graph.offsets)
+        self._save('targets', graph.targets)
+        self._save('edge_ids', graph.edge_ids)
+
+        columns = []
+        for i, name in enumerate(graph.attr_names):
+            column = graph._columns[name]
+            if column.values.dtype == object:
+                self.close()
+                raise ValueError(f'Cannot share column {name} of arbitrary objects')
+            self._save(f'column-{i}', column.values)
+            if column.present is not None:
+                self._save(f'present-{i}', column.present)
+            columns.append((name, column.present is not None, column.categories))
+
+        self.handle = SharedGraphHandle(
+            token=uuid.uuid4().hex,
+            directory=self._directory,
+            directed=graph.directed,
+            columns=tuple(columns)
+        )
+
+    def _save(self, name, array):
+        np.save(os.path.join(self._directory, f'{name}.npy'), np.asarray(array))
+
+    def close(self):
+        if hasattr(self, 'handle'):
+            _attached.pop(self.handle.token, None)
+            _attached_dirs.pop(self.handle.token, None)
+        shutil.rmtree(self._directory, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
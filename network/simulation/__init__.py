@@ -1 +1,2 @@
-from .sim import Simulation, test, run_simulations, create_runner
+from .sim import Simulation, test, run_simulations, run_shared_simulations, create_runner
+from .ensemble import iter_ensemble, run_ensemble, EnsembleStats, broadcast_curve, history_columns
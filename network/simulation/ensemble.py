@@ -0,0 +1,173 @@
+import math
+import random as default_random
+
+import numpy as np
+from pathos.multiprocessing import ProcessingPool
+
+from network.randoms import fix_random, load_fixed_state, spawn_seeds
+from network.shared import SharedGraph
+from network.simulation.sim import run_single_sim, _shutdown_pool
+
+
+def broadcast_curve(sim):
+    return sim.history.column('broadcasts').copy()
+
+
+def history_columns(sim):
+    return {name: values.copy() for name, values in sim.history.to_dict().items()}
+
+
+def iter_ensemble(factory, runs, extract=broadcast_curve, to=None, workers=None,
+                  reproducible=True, graph=None, seed=None):
+    runs = list(runs)
+    if workers is None:
+        workers = min(len(runs), 4)
+    if seed is None:
+        member_seeds = [None] * len(runs)
+    else:
+        seeds = spawn_seeds(seed, 2 * len(runs))
+        member_seeds = list(zip(seeds[::2], seeds[1::2]))
+
+    shared = None if graph is None else SharedGraph(graph)
+    handle = None if shared is None else shared.handle
+    pool = None
+    try:
+        if workers <= 1:
+            for run, seeds in zip(runs, member_seeds):
+                yield _run_member(handle, factory, run, to, reproducible, extract, seeds)
+        else:
+            n_runs = len(runs)
+            pool = ProcessingPool(workers, initializer=load_fixed_state)
+            yield from pool.uimap(_run_member, [handle] * n_runs, [factory] * n_runs, runs,
+                                  [to] * n_runs, [reproducible] * n_runs, [extract] * n_runs,
+                                  member_seeds)
+    finally:
+        if pool is not None and shared is not None:
+            _shutdown_pool(pool)
+        if shared is not None:
+            shared.close()
+
+
+def run_ensemble(factory, runs, extract=broadcast_curve, to=None, workers=None,
+                 reproducible=True, graph=None, seed=None, steps=None):
+    stats = EnsembleStats(steps)
+    for _, result in iter_ensemble(factory, runs, extract, to, workers, reproducible, graph, seed):
+        stats.add(result)
+    return stats
+
+
+def _run_member(handle, factory, run, to, reproducible, extract, seeds=None):
+    args = (run,) if handle is None else (handle.attach(), run)
+    if seeds is None:
+        return run, extract(run_single_sim(factory(*args), to, reproducible))
+
+    member_seed, fallback_seed = seeds
+    with fix_random(state=default_random.Random(fallback_seed).getstate()):
+        sim = factory(*args, random=default_random.Random(member_seed))
+        sim.run(to)
+    return run, extract(sim)
+
+
+class EnsembleStats:
+    def __init__(self, steps=None, bins=256):
+        if bins < 2:
+            raise ValueError('bins must be at least 2')
+        self._steps = steps
+        self._bins = bins
+        self._count = 0
+        self._mean = None
+        self._m2 = None
+        self._histogram = None
+        self._low = None
+        self._width = None
+        self._range = None
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def mean(self):
+        return self._mean
+
+    @property
+    def std(self):
+        if self._m2 is None:
+            return None
+        return np.sqrt(self._m2 / self._count)
+
+    @property
+    def resolution(self):
+        return self._width
+
+    def quantiles(self, q):
+        if self._histogram is None:
+            return None
+        q = np.asarray(q, dtype=float)
+        ranks = np.atleast_1d(q) * (self._count - 1)
+        lower = self._order_statistic(np.floor(ranks))
+        upper = self._order_statistic(np.ceil(ranks))
+        values = lower + (ranks - np.floor(ranks))[:, None] * (upper - lower)
+        return values[0] if q.ndim == 0 else values
+
+    def _order_statistic(self, ranks):
+        cumulative = np.cumsum(self._histogram, axis=1)
+        bins = (cumulative[None, :, :] <= ranks[:, None, None]).sum(axis=2)
+        steps = np.arange(len(cumulative))
+        counts = self._histogram[steps, bins]
+        below = cumulative[steps, bins] - counts
+        return self._low + self._width * (bins + (ranks[:, None] - below + 0.5) / counts)
+
+    def add(self, values):
+        values = np.atleast_1d(np.asarray(values, dtype=float))
+        if self._steps is not None:
+            values = _fit_to(values, self._steps)
+        if self._mean is None:
+            self._mean = np.zeros(len(values))
+            self._m2 = np.zeros(len(values))
+            self._histogram = np.zeros((len(values), self._bins), dtype=np.int64)
+        elif len(values) < len(self._mean):
+            values = _fit_to(values, len(self._mean))
+        elif len(values) > len(self._mean):
+            self._extend(len(values))
+        self._fit_range(values.min(), values.max())
+
+        self._count += 1
+        delta = values - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (values - self._mean)
+        bins = np.minimum(((values - self._low) // self._width).astype(np.int64), self._bins - 1)
+        self._histogram[np.arange(len(values)), bins] += 1
+
+    def _extend(self, steps):
+        extra = steps - len(self._mean)
+        self._mean = np.concatenate([self._mean, np.repeat(self._mean[-1:], extra)])
+        self._m2 = np.concatenate([self._m2, np.repeat(self._m2[-1:], extra)])
+        self._histogram = np.concatenate([self._histogram, np.repeat(self._histogram[-1:], extra, axis=0)])
+
+    def _fit_range(self, low, high):
+        if self._width is not None:
+            low, high = min(low, self._range[0]), max(high, self._range[1])
+            width = self._width
+        else:
+            width = 2.0 ** math.floor(math.log2(max(high - low, 2.0 ** -30) / self._bins))
+        while high >= math.floor(low / width) * width + self._bins * width:
+            width *= 2
+        aligned_low = math.floor(low / width) * width
+        self._range = (low, high)
+        if self._width is None:
+            self._low, self._width = aligned_low, width
+        elif (aligned_low, width) != (self._low, self._width):
+            offset = round((self._low - aligned_low) / self._width)
+            moved = (offset + np.arange(self._bins)) // round(width / self._width)
+            histogram = np.zeros_like(self._histogram)
+            for old_bin, new_bin in enumerate(moved[moved < self._bins].tolist()):
+                histogram[:, new_bin] += self._histogram[:, old_bin]
+            self._histogram, self._low, self._width = histogram, aligned_low, width
+
+
+def _fit_to(values, steps):
+    if len(values) >= steps:
+        return values[:steps]
+    fill = values[-1] if len(values) else np.nan
+    return np.concatenate([values, np.full(steps - len(values), fill)])
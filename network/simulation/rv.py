@@ -1,7 +1,9 @@
-import random
+import random as default_random
+
+import numpy as np
 
 __all__ = [
-    'beta', 'uniform', 'fixed', 'calc_beta_params'
+    'beta', 'uniform', 'fixed', 'choice', 'randint', 'draw', 'calc_beta_params'
 ]
 
 
@@ -16,11 +18,11 @@ def calc_beta_params(mean, sd):
 
 
 def beta(a, b):
-    return _RV(random.betavariate, a=a, b=b)
+    return _RV('betavariate', a=a, b=b)
 
 
 def uniform(a, b):
-    return _RV(random.uniform, a=a, b=b)
+    return _RV('uniform', a=a, b=b)
 
 
 def fixed(val):
@@ -28,28 +30,115 @@ def fixed(val):
 
 
 def choice(*items):
-    return _RV(random.choice, choices=items)
+    return _RV('choice', choices=items)
 
 
 def randint(a, b):
-    return _RV(random.randint, a=a, b=b)
+    return _RV('randint', a=a, b=b)
+
+
+def _choose(gen, n, choices):
+    items = np.empty(len(choices), dtype=object)
+    items[:] = choices
+    return items[gen.integers(len(choices), size=n)]
+
+
+_NUMPY_DRAWS = {
+    'betavariate': lambda gen, n, a, b: gen.beta(a, b, n),
+    'uniform': lambda gen, n, a, b: gen.uniform(a, b, n),
+    'randint': lambda gen, n, a, b: gen.integers(a, b, n, endpoint=True),
+    'choice': _choose,
+}
+
+
+def draw(value, random=None):
+    if isinstance(value, _RV):
+        return value(random)
+    if callable(value):
+        return value()
+    return value
 
 
 class _RV:
-    def __init__(self, func, **params):
+    def __init__(self, func, random=None, **params):
         self._func = func
         self._params = params
+        self._random = random
         self._factor = 1
 
     @property
     def params(self):
         return dict(self._params)
 
-    def __call__(self):
-        return self._factor * self._func(*self._params.values())
+    @property
+    def factor(self):
+        return self._factor
+
+    def _copy(self, random=None, factor=1):
+        copied = _RV(self._func, random, **self._params)
+        copied._factor = factor
+        return copied
+
+    def bind(self, random):
+        return self._copy(random, self._factor)
+
+    def pooled(self, size=1024, seed=None):
+        return _PooledRV(self, size, seed)
+
+    def sample(self, n, random=None):
+        if isinstance(self._func, str):
+            seed = (random or self._random or default_random).getrandbits(64)
+            values = _NUMPY_DRAWS[self._func](np.random.default_rng(seed), n, *self._params.values())
+        else:
+            values = np.array([self._func(*self._params.values()) for _ in range(n)])
+        return values if self._factor == 1 else values * self._factor
+
+    def __call__(self, random=None):
+        if isinstance(self._func, str):
+            func = getattr(random or self._random or default_random, self._func)
+        else:
+            func = self._func
+        value = func(*self._params.values())
+        return value if self._factor == 1 else self._factor * value
 
     def __mul__(self, other):
-        self._factor = other
+        return self._copy(self._random, self._factor * other)
 
     def __rmul__(self, other):
-        self._factor = other
+        return self.__mul__(other)
+
+
+class _PooledRV(_RV):
+    def __init__(self, rv, size, seed=None):
+        super().__init__(rv._func, rv._random, **rv._params)
+        self._factor = rv._factor
+        self._size = size
+        self._seed = seed
+        self._pool_random = None if seed is None else default_random.Random(seed)
+        self._buffer = []
+        self._index = 0
+
+    def _copy(self, random=None, factor=1):
+        return _PooledRV(super()._copy(random, factor), self._size, self._seed)
+
+    def _fill(self, random):
+        block = super().sample(self._size, self._pool_random or random)
+        self._buffer = block.tolist()
+        self._index = 0
+
+    def __call__(self, random=None):
+        if self._index == len(self._buffer):
+            self._fill(random)
+        value = self._buffer[self._index]
+        self._index += 1
+        return value
+
+    def sample(self, n, random=None):
+        values = []
+        while len(values) < n:
+            if self._index == len(self._buffer):
+                self._fill(random)
+            taken = self._buffer[self._index:self._index + n - len(values)]
+            self._index += len(taken)
+            values.extend(taken)
+        return np.array(values)
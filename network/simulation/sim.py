@@ -1,21 +1,34 @@
 import contextlib
-import random
+import random as default_random
+from collections import deque
 from itertools import islice
 
 from pathos.multiprocessing import ProcessingPool
 
-from network.randoms import fix_random
+from network.randoms import fix_random, load_fixed_state
+from network.shared import SharedGraph
+from network.simulation.rv import draw
+
+
+RECORD_LEVELS = ('path', 'history', 'final')
 
 
 class Simulation:
-    def __init__(self, transmission, runner=None):
+    def __init__(self, transmission, runner=None, record='path', keep_last=None):
+        if record not in RECORD_LEVELS:
+            raise ValueError(f'record must be one of {RECORD_LEVELS}')
         self._transmission = transmission
         if not runner:
             self._runner = self._transmission
         else:
             self._runner = runner(transmission)
 
-        self._saved_path = []
+        self._record = record
+        self._saved_path = deque(maxlen=keep_last) if record == 'path' else None
+        if record == 'final':
+            transmission.keep_history(1)
+        elif keep_last is not None:
+            transmission.keep_history(keep_last)
         self._path_completed = False
         self._tracked_index = 0
 
@@ -23,18 +36,34 @@ class Simulation:
         while steps is None or self._tracked_index < steps:
             try:
                 next_path_segment = next(self._runner)
-                self._saved_path.append(next_path_segment)
+                if self._saved_path is not None:
+                    self._saved_path.append(_snapshot(next_path_segment))
                 self._tracked_index += 1
             except StopIteration:
                 self._path_completed = True
                 break
 
+    def run(self, steps=None):
+        if steps is None or (not self._path_completed and steps > self._tracked_index):
+            self._exec_transmission(steps)
+        return self
+
     def path(self, index=None):
-        if index is None or (not self._path_completed and index >= len(self._saved_path)):
-            self._exec_transmission(index)
-        max_index = len(self._saved_path) if index is None else index
+        if self._saved_path is None:
+            raise ValueError(f'Simulation recording {self._record!r} does not save paths')
+        self.run(index)
+        first_saved = self._tracked_index - len(self._saved_path)
+        max_index = len(self._saved_path) if index is None else max(index - first_saved, 0)
         return islice(self._saved_path, max_index)
 
+    @property
+    def record(self):
+        return self._record
+
+    @property
+    def steps(self):
+        return self._tracked_index
+
     @property
     def originating_node(self):
         return self._transmission.originating_node
@@ -48,9 +77,10 @@ class Simulation:
         return self._transmission.history
 
 
-def test(p):
+def test(p, random=None):
+    random = random or default_random
     if callable(p):
-        return random.random() < p()
+        return random.random() < draw(p, random)
     elif 0 <= p <= 1:
         return random.random() < p
     else:
@@ -63,15 +93,47 @@ def run_simulations(*sims, to=None, workers=None, reproducible=True):
 
     if workers is None:
         workers = min(len(sims), 4)
-    pool = ProcessingPool(workers)
+    pool = ProcessingPool(workers, initializer=load_fixed_state)
     return pool.map(run_single_sim, sims)
 
 
 def run_single_sim(sim, to=None, reproducible=True):
     ctx = fix_random if reproducible else contextlib.nullcontext
     with ctx():
-        sim.path(to)
-        return sim
+        return sim.run(to)
+
+
+def run_shared_simulations(graph, factory, runs, to=None, workers=None,
+                           reproducible=True, extract=None):
+    runs = list(runs)
+    if workers is None:
+        workers = min(len(runs), 4)
+
+    with SharedGraph(graph) as shared:
+        n_runs = len(runs)
+        pool = ProcessingPool(workers, initializer=load_fixed_state)
+        try:
+            return pool.map(_run_shared_sim, [shared.handle] * n_runs, [factory] * n_runs, runs,
+                            [to] * n_runs, [reproducible] * n_runs, [extract] * n_runs)
+        finally:
+            _shutdown_pool(pool)
+
+
+def _shutdown_pool(pool):
+    pool.close()
+    pool.join()
+    pool.clear()
+
+
+def _run_shared_sim(handle, factory, run, to, reproducible, extract):
+    sim = run_single_sim(factory(handle.attach(), run), to, reproducible)
+    return extract(sim) if extract else sim.history
+
+
+def _snapshot(path_segment):
+    if path_segment is None:
+        return path_segment
+    return tuple(edge.snapshot() for edge in path_segment)
 
 
 def create_runner(before=None, after=None):
@@ -0,0 +1,147 @@
+import unittest
+
+from network.compact import CompactGraph
+from network.draw import GraphDrawer, _spans
+from network.graph import Graph
+from network.transmission import GraphTransmission, FIFOSelector, DelayedSelector
+
+
+class TestCompactGraph(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.graph = Graph()
+        self.graph.add_edge((1, 2), strength=0.5, kind='core')
+        self.graph.add_edge((2, 1), strength=0.4, kind='weak')
+        self.graph.add_edge((2, 3), strength=0.6)
+        self.compact = CompactGraph.from_graph(self.graph)
+
+        self.undirected_graph = Graph(directed=False)
+        self.undirected_graph.add_edge((1, 2), strength=0.5, kind='core')
+        self.undirected_graph.add_edge((3, 2), strength=0.6, kind='weak')
+        self.undirected_graph.add_edge((2, 4), strength=1)
+        self.undirected_compact = CompactGraph.from_graph(self.undirected_graph)
+
+    @staticmethod
+    def _edges_of(graph):
+        return [(edge.from_node, edge.to_node, edge.attrs) for edge in graph.iter_edges()]
+
+    def test__should_retrieve_nodes(self):
+        self.assertTupleEqual(tuple(self.compact.nodes), (1, 2, 3))
+        self.assertEqual(len(self.undirected_compact.nodes), 4)
+
+    def test__should_count_edges(self):
+        self.assertEqual(self.compact.num_edges, 3)
+        self.assertEqual(self.undirected_compact.num_edges, 3)
+
+    def test__should_count_degrees_like_graph(self):
+        for graph, compact in ((self.graph, self.compact), (self.undirected_graph, self.undirected_compact)):
+            for node in graph.nodes:
+                for kind in (None, 'core', 'weak'):
+                    self.assertEqual(compact.out_degree(node, kind), graph.out_degree(node, kind))
+                    self.assertEqual(compact.in_degree(node, kind), graph.in_degree(node, kind))
+                    self.assertEqual(compact.degree(node, kind), graph.degree(node, kind))
+            self.assertDictEqual(compact.degree_distribution(), graph.degree_distribution())
+            self.assertDictEqual(compact.num_edges_by_kind, graph.num_edges_by_kind)
+
+    def test__should_iter_edges_like_graph(self):
+        self.assertListEqual(self._edges_of(self.compact), self._edges_of(self.graph))
+        self.assertListEqual(self._edges_of(self.undirected_compact),
+                             self._edges_of(self.undirected_graph))
+
+    def test__should_return_outbound_edges_like_graph(self):
+        for node in self.undirected_graph.nodes:
+            self.assertListEqual(
+                [(edge.nodes, edge.attrs) for edge in self.undirected_compact.outbound_edges(node)],
+                [(edge.nodes, edge.attrs) for edge in self.undirected_graph.outbound_edges(node)]
+            )
+
+    def test__should_test_contains_edge(self):
+        self.assertTrue(self.compact.contains_edge((2, 1)))
+        self.assertFalse(self.compact.contains_edge((3, 2)))
+        self.assertFalse(self.compact.contains_edge((4, 1)))
+        self.assertTrue(self.undirected_compact.contains_edge((2, 3)))
+
+    def test__should_return_edge_attributes(self):
+        self.assertDictEqual(self.compact.get_edge_attrs((2, 3)), dict(strength=0.6))
+        self.assertDictEqual(self.undirected_compact.get_edge_attrs((2, 1)),
+                             dict(strength=0.5, kind='core'))
+        with self.assertRaises(ValueError):
+            self.compact.get_edge_attrs((3, 1))
+
+    def test__should_store_attributes_as_columns(self):
+        self.assertListEqual(self.compact.column('strength').tolist(), [0.5, 0.4, 0.6])
+        self.assertListEqual(self.compact.column('kind').tolist(), ['core', 'weak', None])
+
+    def test__should_borrow_edges_while_iterating(self):
+        self.assertListEqual(
+            [(edge.detach().nodes, dict(edge.attrs)) for edge in self.compact.iter_edges(borrowed=True)],
+            [(edge.nodes, dict(edge.attrs)) for edge in self.graph.iter_edges()]
+        )
+        self.assertListEqual([edge.attr('kind') for edge in self.compact.outbound_edges(2, borrowed=True)],
+                             ['weak', None])
+
+        detached = []
+        views = set()
+        for edge in self.compact.iter_edges(borrowed=True):
+            views.add(id(edge.attrs))
+            detached.append(edge.detach())
+        self.assertEqual(len(views), 1)
+        self.assertListEqual([edge.attr('strength') for edge in detached], [0.5, 0.4, 0.6])
+
+    def test__should_return_children_like_graph(self):
+        self.assertListEqual(list(self.undirected_compact.children(1, deg=3)),
+                             list(self.undirected_graph.children(1, deg=3)))
+
+    def test__should_compute_levels_like_graph(self):
+        for directed in (True, False):
+            graph = Graph(directed=directed)
+            for edge in [(0, 1), (0, 2), (1, 3), (2, 3), (3, 0), (3, 4), (4, 4), (2, 5), (5, 1), (6, 0)]:
+                graph.add_edge(edge)
+            compact = CompactGraph.from_graph(graph)
+            for deg in (None, 1, 2):
+                self.assertEqual(compact.levels(0, deg), graph.levels(0, deg))
+            self.assertEqual(compact.levels(0, predicate=lambda node: node != 3),
+                             graph.levels(0, predicate=lambda node: node != 3))
+
+    def test__should_count_undirected_self_loops_once(self):
+        graph = Graph(directed=False)
+        graph.add_edge((1, 1), strength=0.5)
+        graph.add_edge((1, 2), strength=0.6)
+        for compact in (CompactGraph.from_graph(graph),
+                        CompactGraph.from_arrays([1, 2], [0, 0], [0, 1], directed=False, strength=[0.5, 0.6])):
+            self.assertEqual(compact.num_edges, 2)
+            self.assertListEqual(sorted((edge.nodes, edge.attr('strength'))
+                                        for edge in compact.iter_edges()), [((1, 1), 0.5), ((1, 2), 0.6)])
+            self.assertListEqual([edge.nodes for edge in compact.outbound_edges(1)], [(1, 1), (1, 2)])
+            self.assertEqual(compact.out_degree(1), graph.out_degree(1))
+
+    def test__should_build_from_arrays(self):
+        compact = CompactGraph.from_arrays(['a', 'b', 'c'], [0, 1], [1, 2], directed=False,
+                                           strength=[0.1, 0.2], kind=['core', 'weak'])
+        self.assertEqual(compact.num_edges, 2)
+        self.assertTrue(compact.contains_edge(('c', 'b')))
+        self.assertDictEqual(compact.get_edge_attrs(('b', 'c')), dict(strength=0.2, kind='weak'))
+        self.assertListEqual(next(compact.children('b')), ['a', 'c'])
+
+    def test__should_transmit_like_graph(self):
+        graph = Graph()
+        for edge in [(1, 2), (2, 3), (1, 3), (1, 4), (4, 3), (3, 5), (3, 2), (2, 1)]:
+            graph.add_edge(edge)
+        compact = CompactGraph.from_graph(graph)
+
+        for selector in (FIFOSelector, lambda: DelayedSelector(lag=2)):
+            expected = [[edge.nodes for edge in step]
+                        for step in GraphTransmission(graph, 1, selector())]
+            actual = [[edge.nodes for edge in step]
+                      for step in GraphTransmission(compact, 1, selector())]
+            self.assertListEqual(actual, expected)
+
+    def test__should_be_drawable(self):
+        self.assertListEqual(list(_spans(self.undirected_compact, 1)),
+                             list(_spans(self.undirected_graph, 1)))
+        plotter = GraphDrawer(self.undirected_compact)._generate_plotter(1)
+        self.assertEqual(len(plotter._edge_map), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
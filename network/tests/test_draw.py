@@ -1,7 +1,13 @@
 import unittest
 
-from network.graph import Graph
-from network.draw import GraphDrawer, _spans
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.colors import to_rgba
+
+from network.graph import Graph, _Edge
+from network.draw import GraphDrawer, _spans, _layouts, layout_for, radial_positions, MAX_CACHED_LAYOUTS
+from network.simulation import Simulation
+from network.transmission import GraphTransmission, FIFOSelector
 
 
 class TestGraphDrawer(unittest.TestCase):
@@ -33,6 +39,103 @@ class TestGraphDrawer(unittest.TestCase):
             {11: 0.5, 12: 0.5}
         ])
 
+    def test__should_cache_layout_until_topology_changes(self):
+        layout = self.drawer._generate_plotter(1).layout
+        self.assertIs(self.drawer._generate_plotter(1).layout, layout)
+        self.assertEqual(dict(layout.items()), dict(radial_positions(self.graph, 1)))
+
+        self.graph.update_edge((1, 2), strength=0.5)
+        self.assertIs(layout_for(self.graph, 1), layout)
+        self.graph.add_edge((12, 13))
+        updated = layout_for(self.graph, 1)
+        self.assertIsNot(updated, layout)
+        self.assertEqual(len(updated), 13)
+
+    def test__should_keep_radial_offsets_when_rewiring(self):
+        layout = layout_for(self.graph, 1)
+        self.graph.remove_edge((7, 12))
+        self.graph.add_edge((6, 12))
+        rewired = layout_for(self.graph, 1)
+        np.testing.assert_array_equal(rewired.state['fractions'], layout.state['fractions'])
+        for node in (1, 2, 3, 4, 5):
+            self.assertEqual(rewired[node], layout[node])
+
+    def test__should_place_only_new_nodes_next_to_parents(self):
+        graph = Graph(directed=False)
+        for edge in [(1, 2), (1, 3), (2, 4), (3, 5)]:
+            graph.add_edge(edge)
+        graph.add_edge((6, 7))
+        layout = layout_for(graph, 1)
+        self.assertNotIn(6, layout)
+
+        graph.add_edge((4, 8))
+        graph.add_edge((8, 9))
+        graph.add_edge((5, 6))
+        updated = layout_for(graph, 1)
+        np.testing.assert_array_equal(updated.coords[:len(layout)], layout.coords)
+        self.assertEqual(set(updated.nodes) - set(layout.nodes), {6, 7, 8, 9})
+        radius = np.hypot(updated.x, updated.y)
+        self.assertGreater(radius[updated.index[8]], radius[updated.index[4]])
+        self.assertGreater(radius[updated.index[9]], radius[updated.index[8]])
+        self.assertGreater(radius[updated.index[7]], radius[updated.index[6]])
+
+    def test__should_bound_cached_layouts_per_graph(self):
+        for _ in range(MAX_CACHED_LAYOUTS + 3):
+            layout_for(self.graph, 1, lambda graph, start: radial_positions(graph, start))
+        self.assertEqual(len(_layouts[self.graph]), MAX_CACHED_LAYOUTS)
+
+    def test__should_update_color_arrays_and_push_once(self):
+        plotter = self.drawer.draw(1)
+        plotter.mark_path([[_Edge(1, 2)], [_Edge(2, 5)]], 'red')
+        plotter.refresh()
+
+        red, blue = to_rgba('red'), to_rgba('blue')
+        marked_rows = plotter.layout.index.ids_of([1, 2, 5])
+        np.testing.assert_array_equal(plotter.node_colors[marked_rows], [red] * 3)
+        self.assertEqual(tuple(plotter.node_colors[plotter.layout.index[3]]), blue)
+        np.testing.assert_array_equal(plotter.artists[0].get_facecolors(), plotter.node_colors)
+        np.testing.assert_array_equal(plotter.artists[1].get_facecolors(), plotter.edge_colors)
+        self.assertEqual(int((plotter.edge_colors == red).all(axis=1).sum()), 2)
+        plt.close('all')
+
+    def test__should_reuse_plotter_and_artists_across_frames(self):
+        sim = Simulation(GraphTransmission(self.graph, 1, FIFOSelector()))
+        animator = self.drawer.animate
+        plotter = animator.frame(1, sim)
+        scatter = plotter.artists[0]
+        red, blue = to_rgba('red'), to_rgba('blue')
+
+        self.assertIs(animator.frame(3, sim), plotter)
+        self.assertIs(plotter.artists[0], scatter)
+        np.testing.assert_array_equal(scatter.get_facecolors()[plotter.layout.index.ids_of([1, 2, 3, 4])],
+                                      [red] * 4)
+        self.assertEqual(tuple(scatter.get_facecolors()[plotter.layout.index[5]]), blue)
+
+        self.assertIs(animator.frame(1, sim), plotter)
+        self.assertEqual(tuple(scatter.get_facecolors()[plotter.layout.index[3]]), blue)
+        self.assertEqual(tuple(scatter.get_facecolors()[plotter.layout.index[2]]), red)
+
+        plt.figure()
+        self.assertIsNot(animator.frame(2, sim).artists[0], scatter)
+        plt.close('all')
+
+    def test__should_draw_edges_as_line_collection_with_level_of_detail(self):
+        for row, edge in enumerate(self.graph.iter_edges()):
+            self.graph.update_edge(edge.nodes, strength=row / 10)
+        plotter = GraphDrawer(self.graph, edge_backend='lines').draw(1, linewidth=(1, 3), min_strength=0.3,
+                                                                      max_edges=5)
+        lines = plotter.artists[1]
+        self.assertEqual(len(lines.get_segments()), 5)
+        self.assertListEqual([edge.attr('strength') for edge in plotter.visible_edges],
+                             [0.9, 1.0, 1.1, 1.2, 1.3])
+        np.testing.assert_allclose(lines.get_linewidths(), [2.8, 3.0, 3.2, 3.4, 3.6])
+        np.testing.assert_allclose(lines.get_segments()[0], plotter.layout.xy([5, 11]), atol=1e-9)
+
+        plotter.set_edge((5, 11), 'red')
+        plotter.refresh()
+        self.assertEqual(tuple(lines.get_colors()[0]), to_rgba('red'))
+        plt.close('all')
+
 
 if __name__ == '__main__':
     unittest.main()
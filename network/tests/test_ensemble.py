@@ -0,0 +1,143 @@
+import glob
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from network.examples import virus
+from network.examples.community import community_graph
+from network.graph import Graph
+from network.randoms import fix_random
+from network.simulation import (Simulation, rv, EnsembleStats, iter_ensemble, run_ensemble,
+                                broadcast_curve, history_columns)
+from network.transmission import GraphTransmission, FIFOSelector
+
+
+def _chain_graph():
+    graph = Graph(directed=False)
+    for edge in [(0, 1), (1, 2), (2, 3), (3, 4)]:
+        graph.add_edge(edge, strength=1.0)
+    return graph
+
+
+def _fifo_simulation(start):
+    return Simulation(GraphTransmission(_chain_graph(), start, FIFOSelector()))
+
+
+def _fifo_simulation_on(graph, start):
+    return Simulation(GraphTransmission(graph, start, FIFOSelector()))
+
+
+with fix_random():
+    _town, _ = community_graph(10, 3, 10, 40, 40, core_kw={'strength': 0.6},
+                               strong_kw={'strength': 0.4}, weak_kw={'strength': 0.1})
+
+
+def _worker_pid(sim):
+    return os.getpid()
+
+
+def _virus_simulation(start, random=None):
+    return virus.virus_simulation(_town, start, incubation_period=rv.randint(1, 3),
+                                  contagious_for=rv.choice(1, 2), runner=None, random=random)
+
+
+class TestEnsemble(unittest.TestCase):
+    def test__should_yield_each_run_result(self):
+        results = dict(iter_ensemble(_fifo_simulation, [0, 2, 4], workers=2))
+        self.assertCountEqual(results, [0, 2, 4])
+        self.assertListEqual(results[0].tolist(), [1, 2, 3, 4, 5])
+        self.assertListEqual(results[2].tolist(), [1, 2, 3, 4, 5])
+
+    def test__should_run_members_on_shared_graph(self):
+        results = dict(iter_ensemble(_fifo_simulation_on, [0, 4], graph=_chain_graph(),
+                                     workers=1, extract=history_columns))
+        self.assertListEqual(results[4]['steps'].tolist(), [0, 1, 2, 3, 4])
+        self.assertListEqual(results[4]['broadcasts'].tolist(), [1, 2, 3, 4, 5])
+
+    def test__should_release_shared_graph_when_stopped_early(self):
+        graph = _chain_graph()
+        shared_dirs = os.path.join('/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(),
+                                   'network-graph-*')
+        existing = set(glob.glob(shared_dirs))
+        results = iter_ensemble(_fifo_simulation_on, range(5), extract=_worker_pid, workers=2, graph=graph)
+        first_pids = {next(results)[1]}
+        results.close()
+        self.assertSetEqual(set(glob.glob(shared_dirs)), existing)
+
+        second_pids = {pid for _, pid in iter_ensemble(_fifo_simulation_on, range(4), extract=_worker_pid,
+                                                       workers=2, graph=graph)}
+        self.assertTrue(first_pids.isdisjoint(second_pids))
+
+    def test__should_aggregate_ensemble(self):
+        stats = run_ensemble(_fifo_simulation, [0, 2], steps=8, workers=2)
+        self.assertEqual(stats.count, 2)
+        np.testing.assert_array_equal(stats.mean, [1, 2, 3, 4, 5, 5, 5, 5])
+        np.testing.assert_array_equal(stats.std, np.zeros(8))
+
+    def test__should_reproduce_seeded_ensemble_at_any_worker_count(self):
+        serial = dict(iter_ensemble(_virus_simulation, range(6), to=30, workers=1, seed=42))
+        parallel = dict(iter_ensemble(_virus_simulation, range(6), to=30, workers=3, seed=42))
+        self.assertCountEqual(serial, parallel)
+        for run in serial:
+            np.testing.assert_array_equal(serial[run], parallel[run])
+
+        reseeded = dict(iter_ensemble(_virus_simulation, range(6), to=30, workers=1, seed=7))
+        self.assertFalse(all(np.array_equal(serial[run], reseeded[run]) for run in serial))
+
+    def test__should_extract_broadcast_curve(self):
+        sim = _fifo_simulation(0)
+        sim.path()
+        self.assertListEqual(broadcast_curve(sim).tolist(), [1, 2, 3, 4, 5])
+
+
+class TestEnsembleStats(unittest.TestCase):
+    def test__should_compute_running_mean_and_std(self):
+        stats = EnsembleStats()
+        runs = np.random.default_rng(0).random((20, 5))
+        for run in runs:
+            stats.add(run)
+        np.testing.assert_allclose(stats.mean, runs.mean(axis=0))
+        np.testing.assert_allclose(stats.std, runs.std(axis=0))
+        np.testing.assert_allclose(stats.quantiles([0.1, 0.9]), np.quantile(runs, [0.1, 0.9], axis=0),
+                                   atol=stats.resolution)
+        np.testing.assert_allclose(stats.quantiles(0.5), np.median(runs, axis=0), atol=stats.resolution)
+
+    def test__should_pad_short_runs_with_last_value(self):
+        stats = EnsembleStats(steps=4)
+        stats.add([1, 3])
+        stats.add([1, 2, 3, 4, 5])
+        np.testing.assert_array_equal(stats.mean, [1, 2.5, 3, 3.5])
+
+    def test__should_not_depend_on_order_of_runs(self):
+        runs = [[1, 3], [1, 2, 3, 4, 5], [0, 8, 9]]
+        forward, backward = EnsembleStats(), EnsembleStats()
+        for run in runs:
+            forward.add(run)
+        for run in reversed(runs):
+            backward.add(run)
+        padded = [[1, 3, 3, 3, 3], [1, 2, 3, 4, 5], [0, 8, 9, 9, 9]]
+        np.testing.assert_allclose(forward.mean, np.mean(padded, axis=0))
+        np.testing.assert_allclose(backward.mean, forward.mean)
+        np.testing.assert_allclose(backward.std, forward.std)
+        np.testing.assert_array_equal(backward.quantiles([0.25, 0.75]), forward.quantiles([0.25, 0.75]))
+        np.testing.assert_allclose(forward.quantiles([0, 1]),
+                                   [np.min(padded, axis=0), np.max(padded, axis=0)], atol=forward.resolution)
+
+    def test__should_return_none_before_first_run(self):
+        stats = EnsembleStats(steps=3)
+        self.assertEqual(stats.count, 0)
+        self.assertIsNone(stats.mean)
+        self.assertIsNone(stats.std)
+        self.assertIsNone(stats.quantiles([0.1, 0.9]))
+
+    def test__should_aggregate_scalars(self):
+        stats = EnsembleStats()
+        for deaths in (3, 5, 7):
+            stats.add(deaths)
+        np.testing.assert_array_equal(stats.mean, [5])
+
+
+if __name__ == '__main__':
+    unittest.main()
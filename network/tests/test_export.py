@@ -0,0 +1,92 @@
+import filecmp
+import os
+import shutil
+import tempfile
+import unittest
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from network.draw import GraphDrawer
+from network.export import NEVER, export_frames, export_video, frame_schedule
+from network.graph import Graph
+from network.simulation import Simulation
+from network.transmission import GraphTransmission, FIFOSelector
+
+
+class TestExportFrames(unittest.TestCase):
+    def setUp(self) -> None:
+        self.graph = Graph()
+        for edge in [(1, 2), (1, 3), (1, 4), (2, 5), (2, 6), (3, 7), (6, 7),
+                     (4, 8), (4, 9), (4, 10), (5, 11), (6, 11), (7, 11), (7, 12)]:
+            self.graph.add_edge(edge)
+        self.drawer = GraphDrawer(self.graph)
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def _simulation(self):
+        return Simulation(GraphTransmission(self.graph, 1, selector=FIFOSelector()))
+
+    def test__should_schedule_first_marked_frame(self):
+        plotter = self.drawer._generate_plotter(1)
+        node_frames, edge_frames, n_frames = frame_schedule(self._simulation(), plotter, every=2)
+
+        self.assertEqual(n_frames, 8)
+        self.assertListEqual(node_frames.tolist(), [0, 1, 1, 2, 2, 3, 3, 4, 4, 5, 5, 7])
+        self.assertEqual(edge_frames[plotter.edge_rows([(1, 2)])[0]], 1)
+        self.assertEqual(edge_frames[plotter.edge_rows([(6, 7)])[0]], NEVER)
+
+    def test__should_match_marked_path_colors(self):
+        sim = self._simulation()
+        plotter = self.drawer._generate_plotter(1)
+        node_frames, edge_frames, _ = frame_schedule(sim, plotter, every=2)
+        plotter.mark_frames(node_frames, edge_frames, 3, 'red')
+
+        expected = self.drawer._generate_plotter(1)
+        expected.set_node(1, 'red')
+        expected.mark_path(sim.path(4), 'red')
+        np.testing.assert_array_equal(plotter.node_colors, expected.node_colors)
+        np.testing.assert_array_equal(plotter.edge_colors, expected.edge_colors)
+
+    def test__should_export_same_frames_in_parallel(self):
+        serial = export_frames(self._simulation(), self.drawer, os.path.join(self.directory, 'serial'),
+                               every=4, workers=1)
+        parallel = export_frames(self._simulation(), self.drawer, os.path.join(self.directory, 'parallel'),
+                                 every=4, workers=2)
+
+        self.assertListEqual([os.path.basename(path) for path in parallel],
+                             [f'frame-{frame:05d}.png' for frame in range(5)])
+        for left, right in zip(serial, parallel):
+            self.assertTrue(filecmp.cmp(left, right, shallow=False))
+
+    def test__should_stream_png_frames_to_encoder(self):
+        encoder = os.path.join(self.directory, 'encoder')
+        with open(encoder, 'w') as f:
+            f.write('#!/bin/sh\nfor last; do :; done\ncat > "$last"\n')
+        os.chmod(encoder, 0o755)
+        frames = export_frames(self._simulation(), self.drawer, os.path.join(self.directory, 'frames'),
+                               every=2, workers=1)
+
+        expected = b''
+        for frame in frames:
+            with open(frame, 'rb') as f:
+                expected += f.read()
+
+        for workers in (1, 2):
+            path = export_video(self._simulation(), self.drawer, os.path.join(self.directory, 'video.mp4'),
+                                ffmpeg=encoder, every=2, workers=workers)
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(), expected)
+
+    def test__should_leave_pyplot_state_alone(self):
+        backend = plt.get_backend()
+        fig = plt.figure()
+        try:
+            export_frames(self._simulation(), self.drawer, self.directory, every=4, workers=1)
+            self.assertTrue(plt.fignum_exists(fig.number))
+            self.assertIs(plt.gcf(), fig)
+            self.assertEqual(plt.get_backend(), backend)
+        finally:
+            plt.close(fig)
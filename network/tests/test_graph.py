@@ -34,6 +34,66 @@ class TestGraph(unittest.TestCase):
 
         self.assertEqual(self.undirected_graph.num_edges, 6)
 
+    def test__should_count_edges_as_int_undirected(self):
+        self.assertIsInstance(self.undirected_graph.num_edges, int)
+
+    def test__should_count_degrees_directed(self):
+        self.graph.add_edge((3, 1), kind='strong')
+        self.graph.add_node(4)
+        self.assertEqual(self.graph.out_degree(2), 2)
+        self.assertEqual(self.graph.in_degree(1), 2)
+        self.assertEqual(self.graph.degree(1), 3)
+        self.assertEqual(self.graph.degree(4), 0)
+        self.assertEqual(self.graph.in_degree(1, kind='strong'), 1)
+        self.assertEqual(self.graph.out_degree(1, kind='strong'), 0)
+        self.assertDictEqual(dict(self.graph.degree_distribution()), {0: 1, 3: 2, 2: 1})
+
+        self.graph.remove_edge((2, 1))
+        self.assertEqual(self.graph.in_degree(1), 1)
+        self.assertDictEqual(dict(self.graph.degree_distribution()), {0: 1, 2: 3})
+
+    def test__should_count_degrees_undirected(self):
+        self.undirected_graph.add_edges([(3, 4), (4, 1)], kind='strong')
+        self.assertEqual(self.undirected_graph.degree(2), 2)
+        self.assertEqual(self.undirected_graph.in_degree(4), 2)
+        self.assertEqual(self.undirected_graph.degree(4, kind='strong'), 2)
+        self.assertEqual(self.undirected_graph.degree(2, kind='strong'), 0)
+        self.assertDictEqual(dict(self.undirected_graph.degree_distribution()), {2: 4})
+
+        self.undirected_graph.update_edge((4, 3), kind='weak')
+        self.assertEqual(self.undirected_graph.degree(3, kind='strong'), 0)
+        self.assertEqual(self.undirected_graph.degree(3, kind='weak'), 1)
+        self.undirected_graph.remove_edges(of_kind='strong')
+        self.assertDictEqual(dict(self.undirected_graph.degree_distribution()), {1: 2, 2: 2})
+
+    def test__should_count_duplicate_vertices_and_self_loops_once(self):
+        graph = Graph([1, 2, 2, 3], directed=False)
+        self.assertDictEqual(dict(graph.degree_distribution()), {0: 3})
+
+        graph.add_edge((1, 1))
+        graph.add_edge((1, 2))
+        self.assertDictEqual(dict(graph.degree_distribution()), {2: 1, 1: 1, 0: 1})
+        graph.remove_edge((1, 1))
+        self.assertDictEqual(dict(graph.degree_distribution()), {1: 2, 0: 1})
+
+        directed = Graph([1, 1])
+        directed.add_edge((1, 1))
+        self.assertDictEqual(dict(directed.degree_distribution()), {2: 1})
+        directed.remove_edge((1, 1))
+        self.assertDictEqual(dict(directed.degree_distribution()), {0: 1})
+
+    def test__should_count_edges_by_kind(self):
+        self.undirected_graph.add_edges([(3, 4), (4, 1)], kind='strong')
+        self.undirected_graph.add_edge((3, 5), kind='weak')
+        self.assertDictEqual(self.undirected_graph.num_edges_by_kind, {None: 2, 'strong': 2, 'weak': 1})
+        self.undirected_graph.remove_edge((5, 3))
+        self.assertDictEqual(self.undirected_graph.num_edges_by_kind, {None: 2, 'strong': 2})
+        self.assertEqual(self.undirected_graph.num_edges, 4)
+
+    def test__should_raise_error_for_degree_of_nonexistent_node(self):
+        with self.assertRaises(ValueError):
+            self.graph.degree(10)
+
     def test__should_test_contains_node(self):
         self.assertTrue(self.graph.contains_node(2))
         self.assertFalse(self.graph.contains_node(5))
@@ -76,6 +136,55 @@ class TestGraph(unittest.TestCase):
         self.graph.update_edge((2, 1), strength=0)
         self.assertDictEqual(self.graph.get_edge_attrs((2, 1)), dict(strength=0))
 
+    def test__should_return_edges_of_kind(self):
+        self.undirected_graph.add_edge((3, 4), kind='weak', strength=0.1)
+        self.undirected_graph.add_edge((1, 4), kind='weak', strength=0.1)
+        self.assertListEqual(
+            [edge.nodes for edge in self.undirected_graph.edges_of_kind('weak')],
+            [(3, 4), (1, 4)]
+        )
+        self.assertListEqual(list(self.undirected_graph.edges_of_kind('strong')), [])
+
+    def test__should_add_edges_in_bulk(self):
+        values = iter([0.1, 0.2])
+        self.undirected_graph.add_edges([(3, 4), (4, 5)], kind='weak', strength=lambda: next(values))
+        self.assertDictEqual(self.undirected_graph.get_edge_attrs((4, 3)), dict(kind='weak', strength=0.1))
+        self.assertDictEqual(self.undirected_graph.get_edge_attrs((5, 4)), dict(kind='weak', strength=0.2))
+        with self.assertRaises(ValueError):
+            self.undirected_graph.add_edges([(2, 1)])
+
+    def test__should_remove_edges_in_bulk(self):
+        self.undirected_graph.add_edges([(3, 4), (4, 5), (5, 6)], kind='weak', strength=0.1)
+        self.undirected_graph.update_edge((5, 4), strength=0.3)
+
+        removed = self.undirected_graph.remove_edges(of_kind='weak', where=lambda e: e.attr('strength') < 0.2)
+        self.assertListEqual([edge.nodes for edge in removed], [(3, 4), (5, 6)])
+        self.assertListEqual(
+            [edge.nodes for edge in self.undirected_graph.iter_edges()],
+            [(1, 2), (2, 3), (4, 5)]
+        )
+
+        removed = self.undirected_graph.remove_edges(where=lambda e: e.attr('strength') > 0.55)
+        self.assertListEqual([edge.nodes for edge in removed], [(2, 3)])
+        self.assertFalse(self.undirected_graph.contains_edge((3, 2)))
+
+    def test__should_update_edges_in_bulk(self):
+        self.graph.add_edges([(3, 4), (4, 5)], kind='strong', strength=0.4)
+        values = iter([0, 0.4])
+        self.graph.update_edges(of_kind='strong', strength=lambda: next(values))
+        self.assertDictEqual(self.graph.get_edge_attrs((3, 4)), dict(kind='strong', strength=0))
+        self.assertDictEqual(self.graph.get_edge_attrs((4, 5)), dict(kind='strong', strength=0.4))
+
+        self.graph.update_edges(where=lambda e: e.from_node == 4, kind='weak')
+        self.assertListEqual([edge.nodes for edge in self.graph.edges_of_kind('weak')], [(4, 5)])
+        self.assertListEqual([edge.nodes for edge in self.graph.edges_of_kind('strong')], [(3, 4)])
+
+    def test__should_reindex_edge_kind_on_update(self):
+        self.undirected_graph.update_edge((2, 1), kind='weak')
+        self.assertListEqual([edge.nodes for edge in self.undirected_graph.edges_of_kind('weak')], [(1, 2)])
+        self.undirected_graph.remove_edge((2, 1))
+        self.assertListEqual(list(self.undirected_graph.edges_of_kind('weak')), [])
+
     def test__should_update_edge_undirected(self):
         self.undirected_graph.update_edge((2, 1), strength=0)
         self.assertDictEqual(self.undirected_graph.get_edge_attrs((2, 1)), dict(strength=0))
@@ -100,11 +209,43 @@ class TestGraph(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.graph.get_edge_attrs((4, 2))
 
+    def test__should_return_read_only_edge_views(self):
+        edge = next(self.graph.outbound_edges(2))
+        self.graph.update_edge((2, 1), strength=0.9)
+        self.assertEqual(edge.attr('strength'), 0.9)
+        with self.assertRaises(TypeError):
+            edge.attrs['strength'] = 0
+
+    def test__should_order_edges_by_nodes(self):
+        edges = list(self.graph.iter_edges())
+        self.assertListEqual([edge.nodes for edge in sorted(edges, reverse=True)], [(2, 3), (2, 1), (1, 2)])
+        self.assertLess(edges[0], edges[1])
+
+    def test__should_borrow_edges_while_iterating(self):
+        borrowed = [(edge, edge.detach(), edge.attr('strength'))
+                    for edge in self.graph.iter_edges(borrowed=True)]
+        self.assertTrue(all(edge is borrowed[0][0] for edge, _, _ in borrowed))
+        self.assertListEqual([detached.nodes for _, detached, _ in borrowed], [(1, 2), (2, 1), (2, 3)])
+        self.assertListEqual([strength for _, _, strength in borrowed], [0.5, 0.4, 0.6])
+
+        edges = {edge: edge.nodes for edge in self.graph.iter_edges()}
+        for edge in self.graph.outbound_edges(2, borrowed=True):
+            self.assertEqual(edges[edge], edge.nodes)
+            self.assertEqual(hash(edge), hash(edge.detach()))
+            self.assertEqual(edge.detach(), edge)
+
     def test__should_return_immediate_children(self):
         self.graph.add_edge((1, 4), strength=0.6)
         children = next(self.graph.children(1))
         self.assertTupleEqual(tuple(children), (2, 4))
 
+    def test__should_return_immediate_children_like_levels(self):
+        self.graph.add_edge((1, 4), strength=0.6)
+        self.graph.add_edge((1, 1))
+        for predicate in (None, lambda node: node != 4):
+            self.assertListEqual(list(self.graph.children(1, predicate=predicate)),
+                                 self.graph.levels(1, deg=1, predicate=predicate).levels[1:])
+
     def test__should_return_second_degree_children_not_excluding_dups(self):
         self.graph.add_edge((1, 4), strength=0.6)
         _, second_deg_children = tuple(self.graph.children(1, deg=2, exclude_dups=False))
@@ -125,6 +266,18 @@ class TestGraph(unittest.TestCase):
             children = next(multichildren)
             self.assertTupleEqual(tuple(children), ())
 
+    def test__should_return_all_levels_with_child_counts(self):
+        self.graph.add_edge((1, 4), strength=0.6)
+        levels = self.graph.levels(1)
+        self.assertListEqual(levels.levels, [[1], [2, 4], [3], []])
+        self.assertDictEqual(levels.child_counts, {1: 2, 2: 2, 4: 0, 3: 0})
+        self.assertListEqual(self.graph.levels(1, deg=1).levels, [[1], [2, 4]])
+
+    def test__should_return_children_with_dups_for_each_level(self):
+        self.graph.add_edge((1, 4), strength=0.6)
+        levels = tuple(self.graph.children(1, deg=4, exclude_dups=False))
+        self.assertTupleEqual(levels, ([2, 4], [1, 3], [2, 4], [1, 3]))
+
     def test__should_create_a_graph_with_empty_nodes(self):
         graph = Graph(range(10))
         self.assertTupleEqual(tuple(graph.nodes), tuple(range(10)))
@@ -0,0 +1,114 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from network.graph import Graph
+from network.history import TransmissionHistory, TransmissionState, stack_histories, save_histories
+from network.simulation import Simulation, create_runner
+from network.transmission import GraphTransmission, FIFOSelector
+
+
+class TestTransmissionHistory(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.history = TransmissionHistory(capacity=2)
+        for step in range(5):
+            self.history.append(steps=step, broadcasts=step + 1, tests=step + 1)
+
+    def test__should_grow_columns(self):
+        self.assertEqual(len(self.history), 5)
+        self.assertListEqual(self.history.column('broadcasts').tolist(), [1, 2, 3, 4, 5])
+        self.assertEqual(self.history[-1], TransmissionState(steps=4, broadcasts=5, tests=5))
+        self.assertTupleEqual(self.history[1:3], (TransmissionState(1, 2, 2), TransmissionState(2, 3, 3)))
+        with self.assertRaises(IndexError):
+            self.history[5]
+
+    def test__should_keep_last_rows(self):
+        history = self.history.resize(2)
+        for step in range(5, 40):
+            history.append(steps=step, broadcasts=step + 1, tests=step + 1)
+        self.assertListEqual(history.column('steps').tolist(), [38, 39])
+
+    def test__should_register_counters(self):
+        self.history.register('deaths', fill=-1)
+        self.history.append(steps=5, broadcasts=6, tests=6, deaths=2)
+        self.assertListEqual(self.history.column('deaths').tolist(), [-1] * 5 + [2])
+
+    def test__should_return_read_only_columns(self):
+        with self.assertRaises(ValueError):
+            self.history.column('steps')[0] = 10
+
+    def test__should_keep_view_unchanged_by_later_rows(self):
+        view = self.history.view()
+        for step in range(5, 20):
+            self.history.append(steps=step, broadcasts=step + 1, tests=step + 1)
+        self.history.register('deaths')
+        self.assertListEqual(view.column('steps').tolist(), [0, 1, 2, 3, 4])
+        self.assertTupleEqual(view.names, ('steps', 'broadcasts', 'tests'))
+        with self.assertRaises(TypeError):
+            view.append(steps=5, broadcasts=6, tests=6)
+        with self.assertRaises(TypeError):
+            view.register('deaths')
+
+
+class TestTransmissionCounters(unittest.TestCase):
+    def test__should_record_custom_counters(self):
+        graph = Graph()
+        for edge in [(1, 2), (1, 3), (1, 4)]:
+            graph.add_edge(edge)
+        transmission = GraphTransmission(graph, 1, FIFOSelector())
+        transmission.register_counter('vaccinated')
+        sim = Simulation(transmission, create_runner(before=lambda trans: trans.count('vaccinated', 2)))
+        sim.run(3)
+        self.assertListEqual(sim.history.column('vaccinated').tolist(), [0, 2, 4, 6])
+        self.assertDictEqual(transmission.counters, {'vaccinated': 6})
+
+    def test__should_return_read_only_history(self):
+        graph = Graph()
+        for edge in [(1, 2), (1, 3), (2, 3)]:
+            graph.add_edge(edge)
+        transmission = GraphTransmission(graph, 1, FIFOSelector())
+        history = transmission.history
+        tuple(transmission)
+        self.assertEqual(len(history), 1)
+        self.assertEqual(transmission.history[-1].tests, transmission.broadcasts)
+        with self.assertRaises(TypeError):
+            transmission.history.register('deaths')
+
+
+def _history_of(broadcasts):
+    history = TransmissionHistory()
+    for step, count in enumerate(broadcasts):
+        history.append(steps=step, broadcasts=count, tests=count)
+    return history
+
+
+def test__should_stack_histories_into_runs_by_steps():
+    stacked = stack_histories([_history_of([1, 2, 3]), _history_of([1, 4])])
+    assert stacked['broadcasts'].tolist() == [[1, 2, 3], [1, 4, 4]]
+    assert stacked['steps'].shape == (2, 3)
+
+
+def test__should_save_histories_as_npz():
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / 'ensemble.npz'
+        save_histories(path, [_history_of([1, 2]), _history_of([1, 3])])
+        with np.load(path) as saved:
+            assert saved['broadcasts'].tolist() == [[1, 2], [1, 3]]
+
+
+def test__should_save_histories_as_parquet():
+    pq = pytest.importorskip('pyarrow.parquet')
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / 'ensemble.parquet'
+        save_histories(path, [_history_of([1, 2]), _history_of([1, 3])])
+        saved = pq.read_table(path).to_pydict()
+        assert saved['run'] == [0, 0, 1, 1]
+        assert saved['broadcasts'] == [1, 2, 1, 3]
+
+
+if __name__ == '__main__':
+    unittest.main()
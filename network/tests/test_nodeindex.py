@@ -0,0 +1,47 @@
+import unittest
+
+from network.compact import CompactGraph
+from network.graph import Graph
+from network.nodeindex import NodeIndex
+
+
+class TestNodeIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.index = NodeIndex(['a', ('b', 1), 'c'])
+
+    def test__should_intern_contiguous_ids(self):
+        self.assertEqual(self.index.intern('a'), 0)
+        self.assertEqual(self.index.intern('d'), 3)
+        self.assertEqual(self.index[('b', 1)], 1)
+        self.assertListEqual(self.index.ids_of(['c', 'a']).tolist(), [2, 0])
+        self.assertListEqual(self.index.intern_many(['e', 'a']).tolist(), [4, 0])
+
+    def test__should_translate_ids_back_to_nodes(self):
+        self.assertEqual(self.index.node_of(1), ('b', 1))
+        self.assertListEqual(self.index.nodes_of([2, 0]), ['c', 'a'])
+        self.assertTupleEqual(self.index.nodes, ('a', ('b', 1), 'c'))
+
+    def test__should_reject_new_nodes_once_frozen(self):
+        frozen = self.index.freeze()
+        self.assertTrue(frozen.frozen)
+        self.assertIs(frozen.freeze(), frozen)
+        self.assertEqual(frozen.intern('c'), 2)
+        with self.assertRaises(KeyError):
+            frozen.intern('d')
+        self.index.intern('d')
+        self.assertNotIn('d', frozen)
+
+    def test__should_share_ids_between_graph_and_compact_graph(self):
+        graph = Graph(directed=False)
+        graph.add_edge(('x', 'y'))
+        graph.add_edge(('z', 'x'))
+        compact = CompactGraph.from_graph(graph)
+        for node in graph.nodes:
+            self.assertEqual(compact.node_id(node), graph.node_id(node))
+        self.assertEqual(compact.node_index, graph.node_index)
+        self.assertTrue(compact.node_index.frozen)
+
+
+if __name__ == '__main__':
+    unittest.main()
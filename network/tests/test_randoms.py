@@ -0,0 +1,23 @@
+import random
+
+from network.randoms import fix_random, fixed_random, fork_randoms, get_fixed_state
+
+
+def test__should_load_fixed_state_once():
+    assert get_fixed_state() is get_fixed_state()
+
+
+def test__should_restore_fixed_state_each_time():
+    with fix_random():
+        first = [random.random() for _ in range(3)]
+    with fix_random():
+        second = [random.random() for _ in range(3)]
+    assert first == second
+    assert [fixed_random().random() for _ in range(2)] == first[:1] * 2
+
+
+def test__should_fork_independent_reproducible_randoms():
+    forked = [rand.random() for rand in fork_randoms(3)]
+    assert len(set(forked)) == 3
+    assert forked == [rand.random() for rand in fork_randoms(3)]
+    assert forked != [rand.random() for rand in fork_randoms(3, random.Random(1))]
@@ -0,0 +1,42 @@
+import random
+
+import pytest
+
+from network.simulation import rv
+
+
+def test__should_scale_without_mutating():
+    base = rv.uniform(0, 1)
+    scaled = 10 * base
+    assert base.factor == 1
+    assert scaled.factor == 10
+    assert (rv.fixed(3) * 2)() == 6
+    assert 0 <= scaled(random.Random(1)) <= 10
+    assert scaled(random.Random(1)) == 10 * base(random.Random(1))
+
+
+@pytest.mark.parametrize('variable, low, high', [
+    (rv.uniform(2, 3), 2, 3),
+    (rv.beta(2, 5), 0, 1),
+    (rv.randint(1, 3), 1, 3),
+    (rv.choice(4, 5), 4, 5),
+])
+def test__should_sample_in_range(variable, low, high):
+    values = variable.sample(200, random.Random(7))
+    assert len(values) == 200
+    assert low <= values.min() and values.max() <= high
+    assert values.tolist() == variable.sample(200, random.Random(7)).tolist()
+
+
+def test__should_serve_pooled_draws_reproducibly():
+    first = rv.randint(1, 6).pooled(size=4, seed=3)
+    second = rv.randint(1, 6).pooled(size=4, seed=3)
+    draws = [first() for _ in range(10)]
+    assert draws == [second() for _ in range(10)]
+    assert all(type(value) is int for value in draws)
+    assert first.sample(6).tolist() == second.sample(6).tolist()
+
+
+def test__should_seed_unseeded_pool_from_given_random():
+    pooled = rv.beta(2, 2).pooled(size=8)
+    assert rv.draw(pooled, random.Random(5)) == rv.draw(rv.beta(2, 2).pooled(size=8), random.Random(5))
@@ -0,0 +1,51 @@
+import unittest
+
+from network.compact import CompactGraph
+from network.graph import Graph
+from network.shared import SharedGraph
+from network.simulation import Simulation, run_shared_simulations
+from network.transmission import GraphTransmission, FIFOSelector
+
+
+def _fifo_simulation(graph, start):
+    return Simulation(GraphTransmission(graph, start, FIFOSelector()))
+
+
+def _broadcasts(sim):
+    return [state.broadcasts for state in sim.history]
+
+
+class TestSharedGraph(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.graph = Graph(directed=False)
+        self.graph.add_edge(('a', 'b'), strength=0.5, kind='core')
+        self.graph.add_edge(('b', 'c'), strength=0.6, kind='weak')
+        self.graph.add_edge(('c', 'd'), strength=0.7)
+        self.graph.add_edge(('a', 'd'), strength=0.1, kind='core')
+
+    def test__should_attach_to_shared_graph(self):
+        with SharedGraph(self.graph) as shared:
+            attached = shared.handle.attach()
+            self.assertIsInstance(attached, CompactGraph)
+            self.assertIs(shared.handle.attach(), attached)
+            self.assertListEqual(
+                [(edge.nodes, dict(edge.attrs)) for edge in attached.iter_edges()],
+                [(edge.nodes, dict(edge.attrs)) for edge in self.graph.iter_edges()]
+            )
+            del attached
+
+    def test__should_run_simulations_on_shared_graph(self):
+        histories = run_shared_simulations(self.graph, _fifo_simulation, ['a', 'c', 'd'], workers=2)
+        expected = [_fifo_simulation(self.graph, start) for start in ['a', 'c', 'd']]
+        for sim in expected:
+            sim.path()
+        self.assertListEqual(histories, [sim.history for sim in expected])
+
+    def test__should_extract_results_on_shared_graph(self):
+        results = run_shared_simulations(self.graph, _fifo_simulation, ['b'], workers=1, extract=_broadcasts)
+        self.assertListEqual(results, [[1, 2, 3, 4, 4]])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -94,6 +94,41 @@ class TestSimulation(unittest.TestCase):
                 [[(1, 2)], [(1, 3)]]
             )
 
+    def test_record_history_only(self):
+        sim = Simulation(self.transmission, self.runner, record='history')
+        self.assertEqual(sim.run().steps, 6)
+        self.assertEqual(len(sim.history), 7)
+        self.assertDictEqual(sim.history[-1].to_dict(), {'steps': 6, 'broadcasts': 7, 'tests': 7})
+        with self.assertRaises(ValueError):
+            sim.path()
+
+    def test_record_final_only(self):
+        sim = Simulation(self.transmission, record='final')
+        sim.run(2)
+        self.assertTupleEqual(tuple(state.to_dict() for state in sim.history),
+                              ({'steps': 2, 'broadcasts': 3, 'tests': 3},))
+        sim.run()
+        self.assertEqual(sim.history[-1].broadcasts, 5)
+
+    def test_saved_path_keeps_attrs_at_transmission_time(self):
+        self.graph.update_edge((1, 2), strength=0.5)
+        sim = Simulation(self.transmission).run()
+        self.graph.update_edge((1, 2), strength=0.9)
+        self.assertEqual(next(sim.path())[0].attr('strength'), 0.5)
+
+    def test_keep_last_steps(self):
+        sim = Simulation(self.transmission, self.runner, keep_last=2)
+        self.assertListEqual(
+            [TestSimulation._nodes_of(step) for step in sim.path()],
+            [[(4, 6)], [(4, 7)]]
+        )
+        self.assertListEqual([TestSimulation._nodes_of(step) for step in sim.path(5)], [[(4, 6)]])
+        self.assertListEqual([state.steps for state in sim.history], [5, 6])
+
+    def test_reject_unknown_record_level(self):
+        with self.assertRaises(ValueError):
+            Simulation(self.transmission, record='edges')
+
 
 if __name__ == '__main__':
     unittest.main()
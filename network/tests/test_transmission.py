@@ -1,10 +1,13 @@
+import random
 import unittest
 
 import pytest
 
 from network.graph import Graph
-from network.simulation import test as numtest
-from network.transmission import GraphTransmission, FIFOSelector, RandomSelector, DelayedSelector
+from network.simulation import rv, test as numtest, Simulation
+from network.transmission import GraphTransmission, BernoulliTransmission, EventTransmission, \
+    FIFOSelector, RandomSelector, DelayedSelector, NodeStates, COMPARTMENTS, SUSCEPTIBLE, EXPOSED, \
+    INFECTIOUS, RECOVERED, VACCINATED
 from network.randoms import fix_random
 
 
@@ -68,6 +71,17 @@ class TestGraphTransmission(unittest.TestCase):
             [[(1, 3)], [(1, 4)], [(3, 2)], [], [], [(3, 5)], [], []]
         )
 
+    def test__should_transmit_same_path_with_borrowed_edges(self):
+        paths = []
+        for borrow_edges in (False, True):
+            with fix_random():
+                paths.append([TestGraphTransmission._nodes_of(step)
+                              for step in GraphTransmission(
+                        self.graph, 1, DelayedSelector(lag=1), persist_broadcast=1,
+                        test_transmit=lambda trans, edge: numtest(0.75), borrow_edges=borrow_edges
+                    )])
+        self.assertListEqual(paths[0], paths[1])
+
     def test__should_transmit_persistent_broadcast_even_after_emptied(self):
         one_edge_graph = Graph()
         one_edge_graph.add_edge((1, 2))
@@ -79,6 +93,29 @@ class TestGraphTransmission(unittest.TestCase):
 
         self.assertListEqual(path, [[(1, 2)], [], []])
 
+    def test__should_stop_rebroadcasting_once_persistence_expires(self):
+        one_edge_graph = Graph()
+        one_edge_graph.add_edge((1, 2))
+        transmission = GraphTransmission(one_edge_graph, 1, DelayedSelector(lag=1),
+                                         persist_broadcast=2)
+        trackers = []
+        for _ in transmission:
+            trackers.append(transmission.broadcast_tracker)
+
+        self.assertListEqual(trackers, [{1: 1}, {1: 0, 2: 2}, {1: 0, 2: 1}, {1: 0, 2: 0}])
+        self.assertListEqual([state.broadcasts for state in transmission.history], [1, 1, 2, 2, 2])
+
+    def test__should_track_duplicate_arrivals_in_one_step(self):
+        diamond = Graph()
+        for edge in [(1, 2), (1, 3), (2, 4), (3, 4)]:
+            diamond.add_edge(edge)
+        lags = iter([1, 2, 2, 1])
+        transmission = GraphTransmission(diamond, 1, DelayedSelector(lag=lambda: next(lags)))
+        path = [TestGraphTransmission._nodes_of(step) for step in transmission]
+
+        self.assertListEqual(path, [[], [(1, 2)], [(1, 3)], [], [(2, 4), (3, 4)]])
+        self.assertListEqual([state.broadcasts for state in transmission.history], [1, 1, 2, 3, 3, 4])
+
     def test__get_number_of_broadcasts(self):
         transmission = GraphTransmission(self.graph, 3, FIFOSelector())
         tuple(transmission)
@@ -90,6 +127,206 @@ class TestGraphTransmission(unittest.TestCase):
         self.assertEqual(transmission.tests, 4)
 
 
+class TestBernoulliTransmission(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.graph = Graph()
+        for edge in [(1, 2), (2, 3), (1, 3), (1, 4), (4, 3), (3, 5), (3, 2), (2, 1)]:
+            self.graph.add_edge(edge, strength=1.0)
+
+    def test__should_match_graph_transmission_when_edges_always_transmit(self):
+        for persist in (False, 2):
+            expected = GraphTransmission(self.graph, 1, DelayedSelector(lag=1), persist_broadcast=persist)
+            actual = BernoulliTransmission(self.graph, 1, DelayedSelector(lag=1), persist_broadcast=persist)
+            self.assertListEqual([[edge.nodes for edge in step] for step in actual],
+                                 [[edge.nodes for edge in step] for step in expected])
+            self.assertEqual(actual.tests, expected.tests)
+            self.assertListEqual(list(actual.history), list(expected.history))
+
+    def test__should_not_transmit_through_zero_strength_or_factor(self):
+        self.graph.update_edge((1, 4), strength=0)
+        transmission = BernoulliTransmission(self.graph, 1, FIFOSelector())
+        transmission.set_node_factor([5], 0)
+        tuple(transmission)
+        self.assertCountEqual(transmission.broadcast_tracker, [1, 2, 3])
+
+    def test__should_be_reproducible_under_fixed_random(self):
+        self.graph.update_edges(strength=0.5)
+        paths = []
+        for _ in range(2):
+            with fix_random():
+                transmission = BernoulliTransmission(self.graph, 1, FIFOSelector(), persist_broadcast=1)
+                paths.append([[edge.nodes for edge in step] for step in transmission])
+        self.assertListEqual(paths[0], paths[1])
+
+
+class TestEventTransmission(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.graph = Graph(directed=False)
+        for edge in [(0, 1), (1, 2), (2, 3), (1, 4), (4, 5), (0, 6)]:
+            self.graph.add_edge(edge, strength=1.0)
+
+    @staticmethod
+    def _path_of(transmission):
+        return [[edge.nodes for edge in step] for step in transmission]
+
+    def test__should_match_graph_transmission_when_edges_always_transmit(self):
+        for lag, persist in [(0, False), (2, False), (3, 1), (1, 2)]:
+            expected = GraphTransmission(self.graph, 0, DelayedSelector(lag), persist_broadcast=persist)
+            actual = EventTransmission(self.graph, 0, lag, persist_broadcast=persist)
+            self.assertListEqual(self._path_of(actual), self._path_of(expected))
+            self.assertListEqual(list(actual.history), list(expected.history))
+
+    def test__should_match_graph_transmission_with_same_random_draws(self):
+        for edge in [(2, 5), (3, 6), (4, 6)]:
+            self.graph.add_edge(edge, strength=0.5)
+        for edge in [(0, 1), (1, 2), (1, 4)]:
+            self.graph.update_edge(edge, strength=0.5)
+        test_transmit = lambda trans, edge: numtest(edge.attr('strength'), trans.random)
+
+        for seed in range(5):
+            expected_random, actual_random = random.Random(seed), random.Random(seed)
+            expected = GraphTransmission(self.graph, 0, DelayedSelector(2, random=expected_random),
+                                         test_transmit=test_transmit, persist_broadcast=rv.randint(1, 4),
+                                         random=expected_random)
+            actual = EventTransmission(self.graph, 0, 2, test_transmit=test_transmit,
+                                       persist_broadcast=rv.randint(1, 4), random=actual_random)
+            expected.track_compartments()
+            actual.track_compartments()
+            self.assertListEqual(self._path_of(actual), self._path_of(expected))
+            self.assertListEqual(list(actual.history), list(expected.history))
+            self.assertEqual(actual.tests, expected.tests)
+
+    def test__should_step_one_day_at_a_time(self):
+        transmission = EventTransmission(self.graph, 0, lag=5)
+        self.assertEqual(transmission.pending, 2)
+        self.assertListEqual([next(transmission) for _ in range(5)], [()] * 5)
+        self.assertEqual(transmission.steps, 5)
+        self.assertCountEqual([edge.nodes for edge in next(transmission)], [(0, 1), (0, 6)])
+        self.assertEqual(transmission.steps, 6)
+        self.assertEqual(transmission.pending, 2)
+
+    def test__should_count_days_in_simulation(self):
+        sim = Simulation(EventTransmission(self.graph, 0, lag=5)).run(3)
+        self.assertEqual(sim.steps, 3)
+        self.assertListEqual(list(sim.path(3)), [(), (), ()])
+        self.assertEqual(sim.history[-1].steps, 3)
+
+    def test__should_fast_forward_idle_steps(self):
+        transmission = EventTransmission(self.graph, 0, lag=5)
+        self.assertEqual(transmission.next_event(), 6)
+        self.assertEqual(transmission.fast_forward(), 5)
+        self.assertEqual(transmission.fast_forward(), 0)
+        self.assertCountEqual([edge.nodes for edge in next(transmission)], [(0, 1), (0, 6)])
+        self.assertListEqual([state.steps for state in transmission.history], list(range(7)))
+
+    def test__should_broadcast_over_rewired_edges(self):
+        transmission = EventTransmission(self.graph, 0, lag=0, persist_broadcast=2)
+        self.graph.remove_edge((0, 6))
+        self.graph.add_edge((0, 7), strength=1.0)
+        self.assertCountEqual([edge.nodes for edge in next(transmission)], [(0, 1), (0, 6)])
+        self.assertCountEqual([edge.nodes for edge in next(transmission)], [(0, 7), (1, 2), (1, 4)])
+        tuple(transmission)
+        self.assertCountEqual(transmission.broadcast_tracker, [0, 1, 2, 3, 4, 5, 6, 7])
+
+    def test__should_test_edges_when_broadcasting(self):
+        calls = []
+
+        def test_transmit(trans, edge):
+            calls.append(edge.nodes)
+            return edge.to_node != 6 or trans.steps > 0
+
+        transmission = EventTransmission(self.graph, 0, lag=2, test_transmit=test_transmit,
+                                         persist_broadcast=1.5)
+        self.graph.add_edge((0, 7), strength=1.0)
+        self.assertListEqual([edge.nodes for edge in next(transmission)], [])
+        self.assertListEqual(calls, [(0, 1), (0, 6), (0, 6), (0, 7)])
+        tuple(transmission)
+        self.assertEqual(transmission.tests, len(calls))
+        self.assertCountEqual(transmission.broadcast_tracker, [0, 1, 2, 3, 4, 5, 6, 7])
+
+    def test__should_not_transmit_through_zero_strength(self):
+        self.graph.update_edge((1, 4), strength=0)
+        transmission = EventTransmission(self.graph, 0, lag=1, persist_broadcast=3)
+        tuple(transmission)
+        self.assertCountEqual(transmission.broadcast_tracker, [0, 1, 2, 3, 6])
+
+
+class TestNodeStates(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.states = NodeStates(['a', 'b', 'c'])
+
+    def test__should_count_transitions(self):
+        self.assertTrue(self.states.transition('a', INFECTIOUS, timer=2))
+        self.assertFalse(self.states.transition('a', EXPOSED, from_state=SUSCEPTIBLE))
+        self.assertEqual(self.states.state('a'), INFECTIOUS)
+        self.assertEqual(self.states.count(SUSCEPTIBLE), 2)
+        self.assertEqual(self.states.counts()['infectious'], 1)
+
+    def test__should_transition_many_with_mask(self):
+        self.states.transition('b', VACCINATED)
+        moved = self.states.transition_many(['a', 'b', 'c', 'a'], EXPOSED, from_state=SUSCEPTIBLE)
+        self.assertListEqual(moved.tolist(), [0, 2])
+        self.assertListEqual(self.states.mask(EXPOSED).tolist(), [True, False, True])
+        self.assertListEqual(self.states.nodes_in(VACCINATED), ['b'])
+        self.assertEqual(sum(self.states.counts().values()), 3)
+
+    def test__should_tick_timers(self):
+        self.states.transition('a', INFECTIOUS, timer=1)
+        self.states.transition('b', INFECTIOUS, timer=2)
+        self.assertListEqual(self.states.tick(INFECTIOUS).tolist(), [0])
+        self.assertListEqual(self.states.timers.tolist(), [0, 1, 0])
+
+    def test__should_add_unseen_nodes(self):
+        for node in range(20):
+            self.states.transition(node, RECOVERED)
+        self.assertEqual(len(self.states), 23)
+        self.assertEqual(self.states.count(RECOVERED), 20)
+
+
+class TestTransmissionNodeStates(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.graph = Graph()
+        for edge in [(1, 2), (2, 3), (1, 3), (1, 4), (4, 3), (3, 5), (3, 2), (2, 1)]:
+            self.graph.add_edge(edge, strength=1.0)
+
+    def test__should_track_compartments_per_step(self):
+        for transmission in (GraphTransmission(self.graph, 1, DelayedSelector(lag=1), persist_broadcast=1),
+                             BernoulliTransmission(self.graph, 1, DelayedSelector(lag=1),
+                                                   persist_broadcast=1),
+                             EventTransmission(self.graph, 1, lag=1, persist_broadcast=1)):
+            transmission.track_compartments()
+            self.assertEqual(transmission.node_states.state(1), INFECTIOUS)
+            self.assertEqual(transmission.node_states.count(EXPOSED), 3)
+            tuple(transmission)
+            history = transmission.history
+            self.assertListEqual(history.column('exposed').tolist(), [3, 3, 1, 1, 0, 0])
+            self.assertListEqual(history.column('infectious').tolist(), [1, 0, 3, 0, 1, 0])
+            self.assertListEqual(history.column('recovered').tolist(), [0, 1, 1, 4, 4, 5])
+            self.assertEqual(transmission.node_states.count(RECOVERED), 5)
+            self.assertSetEqual(set(COMPARTMENTS) - set(history.names), set())
+
+    def test__should_mark_compartments_unknown_before_tracking(self):
+        transmission = GraphTransmission(self.graph, 1, DelayedSelector(lag=1), persist_broadcast=1)
+        next(transmission)
+        transmission.track_compartments()
+        next(transmission)
+        self.assertListEqual(transmission.history.column('exposed').tolist(), [-1, -1, 1])
+        self.assertListEqual(transmission.history.column('recovered').tolist(), [-1, -1, 1])
+
+    def test__should_let_test_transmit_check_states(self):
+        def not_vaccinated(trans, edge):
+            return not trans.node_states.is_in(edge.to_node, VACCINATED)
+
+        transmission = GraphTransmission(self.graph, 1, FIFOSelector(), test_transmit=not_vaccinated)
+        transmission.node_states.transition(5, VACCINATED)
+        tuple(transmission)
+        self.assertCountEqual(transmission.broadcast_tracker, [1, 2, 3, 4])
+
+
 def test__should_iterate_through_items_fifo_order():
     selector = FIFOSelector()
     for i in range(3):
@@ -127,5 +364,72 @@ def test__should_iterate_through_items_lagged():
         next(selector)
 
 
+def test__should_pick_lagged_items_in_insertion_order():
+    lags = iter([3, 1, 3, 0])
+    selector = DelayedSelector(lag=lambda: next(lags))
+    for item in 'abcd':
+        selector.add(item)
+
+    assert selector.next_due() == 0
+    assert tuple(selector) == (('d',), ('b',), (), ('a', 'c'))
+    assert selector.next_due() is None
+
+
+def test__should_pick_item_added_twice_for_same_due_time_once():
+    lags = iter([2, 1, 1])
+    selector = DelayedSelector(lag=lambda: next(lags))
+    selector.add('a')
+    assert next(selector) == ()
+    selector.add('a')
+    selector.add('b')
+
+    assert tuple(selector) == ((), ('a', 'b'))
+    with pytest.raises(StopIteration):
+        next(selector)
+
+
+def test__should_round_float_lags_up_to_whole_steps():
+    selector = DelayedSelector(lag=rv.uniform(0.2, 0.8))
+    selector.add('a')
+    selector.add('b')
+    assert tuple(selector) == ((), ('a', 'b'))
+
+    selector = DelayedSelector(lag=lambda: 1.5)
+    selector.add('a')
+    assert selector.next_due() == 2
+    assert tuple(selector) == ((), (), ('a',))
+
+
+def test__should_skip_lagged_selector_to_next_due_time():
+    selector = DelayedSelector(lag=5)
+    selector.add(0)
+    next(selector)
+    selector.add(1)
+
+    assert selector.next_due() == 5
+    selector.skip_to(selector.next_due())
+    assert selector.time == 5
+    assert next(selector) == (0,)
+    assert next(selector) == (1,)
+
+    selector.add(2)
+    with pytest.raises(ValueError):
+        selector.skip_to(20)
+
+
+def test__should_draw_lags_from_given_random():
+    import random
+    from network.simulation import rv
+
+    picks = []
+    for _ in range(2):
+        selector = DelayedSelector(lag=rv.randint(0, 5), random=random.Random(3))
+        for i in range(10):
+            selector.add(i)
+        picks.append(tuple(selector))
+    assert picks[0] == picks[1]
+    assert sum(len(pick) for pick in picks[0]) == 10
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,9 +1,22 @@
-import attr
+import heapq
+import math
+import random as default_random
+
+import numpy as np
+
+from network.compact import CompactGraph
+from network.history import TransmissionHistory, TransmissionState
+from network.nodeindex import NodeIndex
+from network.simulation.rv import draw
+
+COMPARTMENTS = ('susceptible', 'exposed', 'infectious', 'recovered', 'vaccinated', 'dead')
+SUSCEPTIBLE, EXPOSED, INFECTIOUS, RECOVERED, VACCINATED, DEAD = range(len(COMPARTMENTS))
+_ARRIVAL, _RECOVERY = range(2)
 
 
 class GraphTransmission:
     def __init__(self, graph, from_node, selector, test_transmit=None,
-                 persist_broadcast=False):
+                 persist_broadcast=False, borrow_edges=False, random=None):
         if not graph.contains_node(from_node):
             raise ValueError(f'Node {from_node} does not exist in this graph')
         self.graph = graph
@@ -11,17 +24,28 @@ class GraphTransmission:
         self.test_transmit = test_transmit
         self._selector = selector
         self._nodes_broadcasted = {}
+        self._active_broadcasters = {}
         self._step_index = 0
         self._tests = 0
         self._persist_broadcast = persist_broadcast
+        self._borrow_edges = borrow_edges
+        self._random = random or default_random
         self._current_step_queued = set()
+        self._counters = {}
+        self._node_states = NodeStates(graph.node_index)
+        self._track_compartments = False
 
-        self._do_broadcast(self.originating_node)
+        self._broadcast([self.originating_node])
         self._track_broadcasts([self.originating_node])
-        self._history = [self.state]
+        self._history = TransmissionHistory()
+        self._record_state()
 
         self.props = {}
 
+    @property
+    def random(self):
+        return self._random
+
     @property
     def steps(self):
         return self._step_index
@@ -48,32 +72,84 @@ class GraphTransmission:
 
     @property
     def history(self):
-        return tuple(self._history)
+        return self._history.view()
+
+    @property
+    def node_states(self):
+        return self._node_states
+
+    def track_compartments(self):
+        for state, name in enumerate(COMPARTMENTS):
+            self._history.register(name, self._node_states.count(state) if self.steps == 0 else -1)
+        self._track_compartments = True
+
+    @property
+    def counters(self):
+        return dict(self._counters)
+
+    def register_counter(self, name, value=0):
+        self._history.register(name, value)
+        self._counters[name] = value
+
+    def count(self, name, by=1):
+        self._counters[name] += by
+
+    def keep_history(self, last=None):
+        self._history = self._history.resize(last)
+
+    def _record_state(self):
+        compartments = self._node_states.counts() if self._track_compartments else {}
+        self._history.append(steps=self.steps, broadcasts=self.broadcasts, tests=self.broadcasts,
+                             **self._counters, **compartments)
 
     def __iter__(self):
         return self
 
+    def _broadcast(self, nodes):
+        for node in nodes:
+            self._do_broadcast(node)
+
     def _do_broadcast(self, node):
-        for edge in self.graph.outbound_edges(node):
+        if self._borrow_edges:
+            outbound_edges = self.graph.outbound_edges(node, borrowed=True)
+        else:
+            outbound_edges = self.graph.outbound_edges(node)
+
+        for edge in outbound_edges:
             node = edge.to_node
             if node not in self._nodes_broadcasted and node not in self._current_step_queued:
                 self._tests += 1
                 if self.test_transmit is None or self.test_transmit(self, edge):
-                    self._selector.add(edge)
+                    self._selector.add(edge.detach() if self._borrow_edges else edge)
                     self._current_step_queued.add(node)
+                    self._node_states.transition(node, EXPOSED, from_state=SUSCEPTIBLE)
 
     def _track_broadcasts(self, nodes):
         for node in nodes:
             if node not in self._nodes_broadcasted:
-                if callable(self._persist_broadcast):
-                    persist = self._persist_broadcast()
-                elif self._persist_broadcast:
-                    persist = self._persist_broadcast
-                else:
-                    persist = 0
+                persist = self._draw_persist()
                 self._nodes_broadcasted[node] = persist
+                if persist > 0:
+                    self._active_broadcasters[node] = None
+                    self._node_states.transition(node, INFECTIOUS, timer=persist)
+                else:
+                    self._node_states.transition(node, RECOVERED)
             else:
                 self._nodes_broadcasted[node] -= 1
+                if self._nodes_broadcasted[node] <= 0:
+                    self._active_broadcasters.pop(node, None)
+                    self._node_states.transition(node, RECOVERED)
+                else:
+                    self._node_states.transition(node, INFECTIOUS, timer=self._nodes_broadcasted[node])
+
+    def _draw_persist(self):
+        if callable(self._persist_broadcast):
+            persist = draw(self._persist_broadcast, self._random)
+        elif self._persist_broadcast:
+            persist = self._persist_broadcast
+        else:
+            persist = 0
+        return int(math.ceil(persist))
 
     def __next__(self):
         self._step_index += 1
@@ -85,40 +161,324 @@ class GraphTransmission:
             for edge in next(self._selector):
                 node = edge.to_node
                 if node not in self._nodes_broadcasted:
-                    self._do_broadcast(node)
                     broadcasts.append(node)
                     edges.append(edge)
         except StopIteration:
             selector_emptied = True
 
-        for broadcast_again in (
-            node for node, broadcasts_left in self._nodes_broadcasted.items() if broadcasts_left > 0
-        ):
-            self._do_broadcast(broadcast_again)
-            broadcasts.append(broadcast_again)
+        broadcasts.extend(self._active_broadcasters)
+        self._broadcast(broadcasts)
 
         if selector_emptied and not broadcasts and not edges:
             raise StopIteration
 
         self._track_broadcasts(broadcasts)
-        self._history.append(self.state)
+        self._record_state()
         self._current_step_queued.clear()
 
         return tuple(edges)
 
 
-@attr.s(frozen=True, slots=True)
-class TransmissionState:
-    steps: int = attr.ib()
-    broadcasts: int = attr.ib()
-    tests: int = attr.ib()
+class BernoulliTransmission(GraphTransmission):
+    def __init__(self, graph, from_node, selector, strength='strength',
+                 persist_broadcast=False, random_state=None, random=None):
+        if not isinstance(graph, CompactGraph):
+            graph = CompactGraph.from_graph(graph)
+        n_nodes = len(graph.nodes)
+        if random_state is None:
+            random_state = (random or default_random).getrandbits(64)
+
+        self._rng = np.random.default_rng(random_state)
+        self._strengths = None if strength is None else np.asarray(graph.column(strength), dtype=float)
+        self._node_factors = np.ones(n_nodes)
+        self._broadcasted = np.zeros(n_nodes, dtype=bool)
+        self._queued = np.zeros(n_nodes, dtype=bool)
+        self._queued_ids = []
+        super().__init__(graph, from_node, selector, persist_broadcast=persist_broadcast,
+                         random=random)
+
+    @property
+    def node_factors(self):
+        return self._node_factors
+
+    def set_node_factor(self, nodes, factor):
+        ids = [self.graph.node_id(node) for node in nodes]
+        self._node_factors[ids] = factor
+
+    def _broadcast(self, nodes):
+        if not nodes:
+            return
+        graph = self.graph
+        from_ids = np.array([graph.node_id(node) for node in nodes], dtype=np.int64)
+        starts = graph.offsets[from_ids]
+        counts = graph.offsets[from_ids + 1] - starts
+        n_slots = counts.sum()
+        if n_slots == 0:
+            return
+
+        first_positions = np.cumsum(counts) - counts
+        slots = np.arange(n_slots) + np.repeat(starts - first_positions, counts)
+        to_ids = graph.targets[slots]
+
+        candidates = ~(self._broadcasted[to_ids] | self._queued[to_ids])
+        slots, to_ids = slots[candidates], to_ids[candidates]
+
+        edge_ids = graph.edge_ids[slots]
+        p = self._node_factors[to_ids]
+        if self._strengths is not None:
+            p = p * self._strengths[edge_ids]
+        passed = np.flatnonzero(self._rng.random(len(slots)) < p)
+
+        queued_to_ids, first_passed = np.unique(to_ids[passed], return_index=True)
+        first_passed = passed[first_passed]
+        self._tests += self._count_tests(to_ids, queued_to_ids, first_passed)
+
+        first_passed.sort()
+        self._queued[to_ids[first_passed]] = True
+        self._queued_ids.extend(to_ids[first_passed].tolist())
+        self._node_states.transition_ids(to_ids[first_passed], EXPOSED, from_state=SUSCEPTIBLE)
+        for edge in graph.edges_at(slots[first_passed]):
+            self._selector.add(edge)
+
+    @staticmethod
+    def _count_tests(to_ids, queued_to_ids, first_passed):
+        if not len(queued_to_ids):
+            return len(to_ids)
+        lookup = np.minimum(np.searchsorted(queued_to_ids, to_ids), len(queued_to_ids) - 1)
+        is_queued = queued_to_ids[lookup] == to_ids
+        tested_before_queued = np.arange(len(to_ids)) <= first_passed[lookup]
+        return int(np.count_nonzero(~is_queued | tested_before_queued))
+
+    def _track_broadcasts(self, nodes):
+        super()._track_broadcasts(nodes)
+        self._broadcasted[[self.graph.node_id(node) for node in nodes]] = True
+
+    def __next__(self):
+        try:
+            return super().__next__()
+        finally:
+            self._queued[self._queued_ids] = False
+            self._queued_ids = []
+
+
+class EventTransmission(GraphTransmission):
+    def __init__(self, graph, from_node, lag, strength='strength', test_transmit=None,
+                 persist_broadcast=False, borrow_edges=False, random=None):
+        if not callable(lag) and lag < 0:
+            raise ValueError('Lag parameter must be a positive integer')
+        if test_transmit is None and strength is not None:
+            test_transmit = _strength_test(strength)
+        self.lag = lag
+        self._calendar = {}
+        self._event_days = []
+        self._pending = 0
+        self._contacts = {}
+        super().__init__(graph, from_node, None, test_transmit=test_transmit,
+                         persist_broadcast=persist_broadcast, borrow_edges=borrow_edges, random=random)
 
-    def to_dict(self):
-        return {
-            'steps': self.steps,
-            'broadcasts': self.broadcasts,
-            'tests': self.tests,
-        }
+    @property
+    def pending(self):
+        return self._pending
+
+    def next_event(self):
+        if self._active_broadcasters:
+            return self._step_index + 1
+        return self._event_days[0] if self._event_days else None
+
+    def fast_forward(self):
+        next_event = self.next_event()
+        if next_event is None:
+            return 0
+        skipped = next_event - self._step_index - 1
+        for _ in range(skipped):
+            self._step_index += 1
+            self._record_state()
+            self._current_step_queued.clear()
+        return skipped
+
+    def _schedule(self, day, event, item):
+        bucket = self._calendar.get(day)
+        if bucket is None:
+            bucket = self._calendar[day] = ([], [])
+            heapq.heappush(self._event_days, day)
+        bucket[event].append(item)
+
+    def _do_broadcast(self, node):
+        version = self.graph.version
+        cached = self._contacts.get(node)
+        fresh = cached is None or cached[0] != version
+        edges = self.graph.outbound_edges(node, borrowed=self._borrow_edges) if fresh else cached[1]
+
+        contacts = []
+        for edge in edges:
+            to_node = edge.to_node
+            if to_node in self._nodes_broadcasted:
+                continue
+            if fresh and self._borrow_edges:
+                edge = edge.detach()
+            contacts.append(edge)
+            if to_node not in self._current_step_queued:
+                self._tests += 1
+                if self.test_transmit is None or self.test_transmit(self, edge):
+                    lag = draw(self.lag, self._random) if callable(self.lag) else self.lag
+                    if lag < 0:
+                        raise ValueError('Lag parameter must be a positive integer')
+                    self._schedule(self._step_index + int(math.ceil(lag)) + 1, _ARRIVAL, edge)
+                    self._pending += 1
+                    self._current_step_queued.add(to_node)
+                    self._node_states.transition(to_node, EXPOSED, from_state=SUSCEPTIBLE)
+        self._contacts[node] = (version, contacts)
+
+    def _track_broadcasts(self, nodes):
+        for node in nodes:
+            persist = self._draw_persist()
+            self._nodes_broadcasted[node] = persist
+            if persist > 0:
+                self._active_broadcasters[node] = self._step_index + persist
+                self._schedule(self._step_index + persist, _RECOVERY, node)
+                self._node_states.transition(node, INFECTIOUS, timer=persist)
+            else:
+                self._contacts.pop(node, None)
+                self._node_states.transition(node, RECOVERED)
+
+    def _recover(self, nodes):
+        for node in nodes:
+            del self._active_broadcasters[node]
+            self._contacts.pop(node, None)
+            self._nodes_broadcasted[node] = 0
+            self._node_states.transition(node, RECOVERED)
+
+        for node, recovery_day in self._active_broadcasters.items():
+            self._nodes_broadcasted[node] = recovery_day - self._step_index
+            self._node_states.transition(node, INFECTIOUS, timer=recovery_day - self._step_index)
+
+    def __next__(self):
+        self._step_index += 1
+        bucket = self._calendar.pop(self._step_index, None)
+        if bucket is None:
+            if not self._active_broadcasters and not self._calendar:
+                raise StopIteration
+            arrivals, recoveries = (), ()
+        else:
+            heapq.heappop(self._event_days)
+            arrivals, recoveries = bucket
+            self._pending -= len(arrivals)
+
+        edges = {}
+        for edge in arrivals:
+            if edge.to_node not in self._nodes_broadcasted and edge.to_node not in edges:
+                edges[edge.to_node] = edge
+
+        self._broadcast(list(edges) + list(self._active_broadcasters))
+        self._track_broadcasts(edges)
+        self._recover(recoveries)
+        self._record_state()
+        self._current_step_queued.clear()
+
+        return tuple(edges.values())
+
+
+def _strength_test(strength):
+    return lambda trans, edge: trans.random.random() < draw(edge.attr(strength), trans.random)
+
+
+class NodeStates:
+    def __init__(self, nodes=()):
+        self._index = NodeIndex(nodes)
+        capacity = max(len(self._index), 16)
+        self._states = np.full(capacity, SUSCEPTIBLE, dtype=np.int8)
+        self._timers = np.zeros(capacity, dtype=np.int32)
+        self._counts = np.zeros(len(COMPARTMENTS), dtype=np.int64)
+        self._counts[SUSCEPTIBLE] = len(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, node):
+        return node in self._index
+
+    @property
+    def node_index(self):
+        return self._index
+
+    @property
+    def nodes(self):
+        return self._index.nodes
+
+    @property
+    def states(self):
+        states = self._states[:len(self._index)]
+        states.flags.writeable = False
+        return states
+
+    @property
+    def timers(self):
+        timers = self._timers[:len(self._index)]
+        timers.flags.writeable = False
+        return timers
+
+    def node_id(self, node):
+        node_id = self._index.get(node)
+        if node_id is None:
+            node_id = self._index.intern(node)
+            if node_id == len(self._states):
+                self._states = np.concatenate([self._states, np.full_like(self._states, SUSCEPTIBLE)])
+                self._timers = np.concatenate([self._timers, np.zeros_like(self._timers)])
+            self._counts[SUSCEPTIBLE] += 1
+        return node_id
+
+    def state(self, node):
+        return int(self._states[self.node_id(node)])
+
+    def is_in(self, node, state):
+        return self.state(node) == state
+
+    def timer(self, node):
+        return int(self._timers[self.node_id(node)])
+
+    def transition(self, node, state, from_state=None, timer=0):
+        node_id = self.node_id(node)
+        current = self._states[node_id]
+        if from_state is not None and current != from_state:
+            return False
+        self._counts[current] -= 1
+        self._counts[state] += 1
+        self._states[node_id] = state
+        self._timers[node_id] = timer
+        return True
+
+    def transition_many(self, nodes, state, from_state=None, timer=0):
+        return self.transition_ids([self.node_id(node) for node in nodes], state, from_state, timer)
+
+    def transition_ids(self, ids, state, from_state=None, timer=0):
+        ids = np.unique(np.asarray(ids, dtype=np.int64))
+        if from_state is not None:
+            ids = ids[self._states[ids] == from_state]
+        self._counts -= np.bincount(self._states[ids], minlength=len(COMPARTMENTS))
+        self._counts[state] += len(ids)
+        self._states[ids] = state
+        self._timers[ids] = timer
+        return ids
+
+    def tick(self, state=None):
+        timers = self._timers[:len(self._index)]
+        ticking = timers > 0
+        if state is not None:
+            ticking &= self._states[:len(self._index)] == state
+        timers[ticking] -= 1
+        return np.flatnonzero(ticking & (timers == 0))
+
+    def mask(self, state):
+        return self._states[:len(self._index)] == state
+
+    def nodes_in(self, state):
+        return self._index.nodes_of(np.flatnonzero(self.mask(state)))
+
+    def count(self, state):
+        return int(self._counts[state])
+
+    def counts(self):
+        return dict(zip(COMPARTMENTS, self._counts.tolist()))
 
 
 class Selector:
@@ -165,35 +525,66 @@ class FIFOSelector(Selector):
 class RandomSelector(Selector):
     def __init__(self, random=None, n=1):
         super().__init__(set())
-        import random as default_random
         self._random = random or default_random
         self.n = n
 
     def _pick(self):
-        npick = self.n() if callable(self.n) else self.n
-        picked = self._random.sample(self._items, min(npick, len(self._items)))
+        npick = draw(self.n, self._random) if callable(self.n) else self.n
+        picked = self._random.sample(tuple(self._items), min(npick, len(self._items)))
         for item in picked:
             self._items.discard(item)
         return tuple(picked)
 
 
 class DelayedSelector(Selector):
-    def __init__(self, lag):
+    def __init__(self, lag, random=None):
         if not callable(lag) and lag < 0:
             raise ValueError('Lag parameter must be a positive integer')
-        super().__init__(set())
+        super().__init__({})
         self.lag = lag
+        self._random = random or default_random
         self._time_counter = 0
+        self._due_times = []
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def empty(self):
+        return self._size == 0
 
     def add(self, item):
-        lag_time = self.lag() if callable(self.lag) else self.lag
-        item_with_lag_counter = (self._time_counter + lag_time, item)
-        super().add(item_with_lag_counter)
+        lag_time = draw(self.lag, self._random) if callable(self.lag) else self.lag
+        if lag_time < 0:
+            raise ValueError('Lag parameter must be a positive integer')
+        due_time = self._time_counter + int(math.ceil(lag_time))
+        if due_time not in self._items:
+            self._items[due_time] = {}
+            heapq.heappush(self._due_times, due_time)
+        bucket = self._items[due_time]
+        if item not in bucket:
+            bucket[item] = None
+            self._size += 1
+
+    @property
+    def time(self):
+        return self._time_counter
+
+    def next_due(self):
+        if self.empty():
+            return None
+        return self._due_times[0]
+
+    def skip_to(self, time):
+        if not self.empty() and time > self.next_due():
+            raise ValueError(f'Cannot skip past pending items due at {self.next_due()}')
+        self._time_counter = max(self._time_counter, time)
 
     def _pick(self):
-        items_to_pick = [(t, item) for (t, item) in self._items
-                         if self._time_counter == t]
-        for picked in items_to_pick:
-            self._items.discard(picked)
+        picked = ()
+        if self._due_times and self._due_times[0] == self._time_counter:
+            heapq.heappop(self._due_times)
+            picked = tuple(self._items.pop(self._time_counter))
+            self._size -= len(picked)
         self._time_counter += 1
-        return tuple(item for (t, item) in items_to_pick)
+        return picked